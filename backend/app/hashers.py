@@ -0,0 +1,21 @@
+"""
+Password hashers for the project.
+"""
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id password hasher with the cost tuned for the API servers,
+    aiming for about 250 ms per hash. Re-time make_password on the
+    servers when they change and adjust the costs to match.
+    Passwords hashed with other costs are rehashed when users log in.
+    Extends Django's Argon2PasswordHasher.
+    """
+
+    # Number of passes over the memory
+    time_cost = 3
+    # Memory used per hash, in KiB (64 MiB)
+    memory_cost = 64 * 1024
+    # Number of threads per hash
+    parallelism = 2
@@ -0,0 +1,58 @@
+"""
+Mixins for the REST API views.
+"""
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Retrieve an object with an ETag, returning 304 NOT MODIFIED
+    without serializing the object when the client's copy is current.
+    The ETag changes when the object's modified time field does.
+    """
+
+    # DateTime field of the object updated whenever it is modified
+    etag_field = None
+
+    def get_etag(self, instance):
+        """
+        Return the weak ETag of the object for the response format.
+        Weak as the object can be rendered differently, e.g. the
+        browsable API, without its field values changing.
+        """
+
+        # Time the object was last modified, in microseconds
+        modified = int(getattr(instance, self.etag_field).timestamp() * 1e6)
+        # Format the response is rendered in, e.g. json or api
+        renderer_format = self.request.accepted_renderer.format
+
+        return 'W/' + quote_etag(
+            f'{instance.pk}-{modified}-{renderer_format}'
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the object, or 304 NOT MODIFIED if the ETag matches
+        the If-None-Match request header.
+        """
+
+        # Get the object and its current ETag
+        instance = self.get_object()
+        etag = self.get_etag(instance)
+
+        # ETags of the client's copies, or ['*'] for any copy
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+
+        # If the client has the current version of the object
+        if etag in client_etags or client_etags == ['*']:
+            # Return an empty 304 NOT MODIFIED response
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+
+        # Serialize and return the object with its ETag
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': etag})
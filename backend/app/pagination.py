@@ -0,0 +1,19 @@
+"""
+Pagination for the REST APIs.
+"""
+from rest_framework.pagination import PageNumberPagination
+
+
+class TopicPagination(PageNumberPagination):
+    """
+    Paginates topic lists, so a response never loads every topic
+    and their nested attributes into memory at once.
+    Extends DRF's PageNumberPagination.
+    """
+
+    # Number of topics per page by default
+    page_size = 50
+    # Allow the client to ask for a page size, e.g. ?page_size=20
+    page_size_query_param = 'page_size'
+    # Hard limit on the page size the client can ask for
+    max_page_size = 100
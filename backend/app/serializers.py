@@ -0,0 +1,66 @@
+"""
+Base serializers for the REST APIs.
+"""
+import copy
+
+from rest_framework import serializers
+
+
+def _copy_field(field):
+    """
+    Return a shallow copy of an unbound serializer field.
+    A nested list serializer gets a copy of its child, with the copy
+    as its parent. The child is already bound so only the parent changes.
+    """
+
+    field = copy.copy(field)
+    if isinstance(field, serializers.ListSerializer):
+        field.child = copy.copy(field.child)
+        field.child.parent = field
+    return field
+
+
+class CachedFieldsMixin:
+    """
+    Builds the serializer's fields once per serializer class.
+    DRF builds the model fields, or deep copies the declared fields
+    and nested serializers, for every serializer instance otherwise.
+    """
+
+    def get_fields(self):
+        """
+        Return copies of the fields built for the serializer class.
+        """
+
+        # Build the fields the first time the class is used. Checks the
+        # class itself so subclasses build their own fields
+        cls = type(self)
+        if '_fields_cache' not in cls.__dict__:
+            fields = super().get_fields()
+            # Freeze the validators, the copies of a field share them
+            # so no instance can change another's validators
+            for field in fields.values():
+                field.validators = tuple(field.validators)
+            cls._fields_cache = fields
+
+        # Return copies of the cached fields to bind to this instance
+        # The cached fields themselves are never bound or used
+        return {
+            name: _copy_field(field)
+            for name, field in cls._fields_cache.items()
+        }
+
+
+class CachedFieldsSerializer(CachedFieldsMixin, serializers.Serializer):
+    """
+    Serializer that builds its fields once per serializer class.
+    Extends CachedFieldsMixin and DRF's Serializer.
+    """
+
+
+class CachedFieldsModelSerializer(
+        CachedFieldsMixin, serializers.ModelSerializer):
+    """
+    Model serializer that builds its fields once per serializer class.
+    Extends CachedFieldsMixin and DRF's ModelSerializer.
+    """
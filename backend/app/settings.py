@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -87,10 +88,36 @@ DATABASES = {
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        # Keep connections open between requests for this many seconds,
+        # rather than connecting to the database for every request
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        # Check a kept connection still works before a request uses it,
+        # so a connection closed by the database is replaced, not an error
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Cache, shared by the processes with Redis if REDIS_URL is set, else
+# a cache that stores nothing. A cache in the memory of each process
+# would keep serving entries another process has invalidated
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -110,6 +137,23 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/#using-argon2-with-django
+
+PASSWORD_HASHERS = [
+    # Argon2id with the cost tuned in app.hashers, used for new passwords
+    'app.hashers.TunedArgon2PasswordHasher',
+    # Existing passwords are checked with their hasher,
+    # then rehashed with Argon2id when users log in. Passwords hashed
+    # by Django's Argon2 hasher are checked by the tuned hasher, which
+    # has the same algorithm name, and rehashed if their costs differ
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
@@ -139,4 +183,50 @@ AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     # Use drf_spectacular's automatic OpenAPI schema generator
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Render JSON with orjson, keeping the browsable API
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
+
+
+# Test run settings
+# Running under the Django test runner (manage.py test) or pytest
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+
+class DisableMigrations:
+    """
+    Migration modules setting that reports no migrations for any app,
+    so the test database is created straight from the current models.
+    """
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
+
+
+if TESTING:
+    # Fast password hasher. The default PBKDF2 hasher is deliberately
+    # slow and would dominate the run time of the test suite
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Only the password validators the tests exercise
+    AUTH_PASSWORD_VALIDATORS = [
+        validator for validator in AUTH_PASSWORD_VALIDATORS
+        if not validator['NAME'].endswith('UserAttributeSimilarityValidator')
+    ]
+    # Create the test database tables from the models instead of
+    # running every migration. Missing migrations are caught by
+    # makemigrations --check in CI instead
+    MIGRATION_MODULES = DisableMigrations()
+    # The tests run in one process, so a cache in its memory is shared
+    # and the caching can be tested without Redis. Tests that cache
+    # clear it in their set up, so entries do not leak between tests
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
@@ -0,0 +1,95 @@
+"""
+Pytest fixtures shared by the whole backend test suite.
+"""
+import fcntl
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings_xdist_suffix():
+    """
+    Keep the test database name the same on every xdist worker.
+    The workers share one migrated template database and clone it,
+    instead of each worker creating and migrating its own database.
+    """
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(
+    request,
+    tmp_path_factory,
+    django_test_environment,
+    django_db_blocker,
+    django_db_keepdb,
+    django_db_createdb,
+    django_db_modify_db_settings,
+):
+    """
+    Set up the test database once for the session. The migrated
+    database is a template that each xdist worker clones with
+    CREATE DATABASE ... TEMPLATE, which is far quicker than migrating.
+    """
+    from django.test.utils import setup_databases, teardown_databases
+
+    # xdist worker id (gw0, gw1, ...), None when running without xdist
+    worker_id = getattr(request.config, 'workerinput', {}).get('workerid')
+    verbosity = request.config.option.verbose
+
+    # Directory shared by all the workers of this pytest session
+    shared_dir = tmp_path_factory.getbasetemp()
+    if worker_id is not None:
+        shared_dir = shared_dir.parent
+
+    # Marker left by the first worker to set up the template
+    created_marker = shared_dir / 'django_db_created'
+
+    with django_db_blocker.unblock():
+        # Only one worker at a time may create, migrate or clone the
+        # template, Postgres refuses to clone a database in use
+        with open(shared_dir / 'django_db.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            # The first worker to get the lock keeps or rebuilds the
+            # template as --reuse-db and --create-db ask. The others
+            # keep the template it set up, rather than rebuild it again.
+            # Checked under the lock, so only one worker rebuilds it
+            if created_marker.exists():
+                keepdb = True
+            else:
+                keepdb = django_db_keepdb and not django_db_createdb
+
+            db_cfg = setup_databases(
+                verbosity=verbosity, interactive=False, keepdb=keepdb
+            )
+            created_marker.touch()
+
+            # Clone the template for this worker and point the
+            # connection at the clone
+            if worker_id is not None:
+                for connection, _, _ in db_cfg:
+                    connection.creation.clone_test_db(
+                        suffix=worker_id, verbosity=verbosity
+                    )
+                    connection.creation.setup_worker_connection(worker_id)
+
+    def teardown_database():
+        """Drop this worker's clone, or the database without xdist."""
+
+        with django_db_blocker.unblock():
+            try:
+                if worker_id is not None:
+                    # The connection already points at the clone. The
+                    # template is kept, the other workers clone it
+                    for connection, old_name, _ in db_cfg:
+                        connection.creation.destroy_test_db(
+                            old_name, verbosity=verbosity
+                        )
+                elif not django_db_keepdb:
+                    teardown_databases(db_cfg, verbosity=verbosity)
+            except Exception as exc:
+                request.node.warn(pytest.PytestWarning(
+                    'Error when trying to teardown test databases: %r' % exc
+                ))
+
+    request.addfinalizer(teardown_database)
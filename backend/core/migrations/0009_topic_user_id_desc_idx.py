@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-16 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_alter_question_wrong_answers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['user', '-id'], name='topic_user_id_desc_idx'),
+        ),
+    ]
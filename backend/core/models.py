@@ -67,6 +67,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Users are not staff (admin access) by default
     # It can be changed to True to give admin access.
     is_staff = models.BooleanField(default=False)
+    # Date and time the user was last updated. Stores the
+    # current DateTime on User creation and updates.
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Assign manager to model
     objects = UserManager()
@@ -75,6 +78,22 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
+class TopicManager(models.Manager):
+    """
+    Topic manager with the topic API queries.
+    Extends Django's Manager.
+    """
+
+    def for_user(self, user):
+        """
+        Return the user's topics ordered by most recently created,
+        using the topic (user, -id) index.
+        """
+
+        # Filter by user first, the most selective filter
+        return self.filter(user=user).order_by('-id')
+
+
 class Topic(models.Model):
     """
     Model for the topic to be studied.
@@ -109,6 +128,18 @@ class Topic(models.Model):
     # A question can have many topics.
     questions = models.ManyToManyField('Question')
 
+    # Assign manager to model
+    objects = TopicManager()
+
+    class Meta:
+        """Meta class allows for options for the model"""
+
+        # Index matching the topic API query, a user's topics
+        # ordered by most recently created
+        indexes = [
+            models.Index(fields=['user', '-id'], name='topic_user_id_desc_idx')
+        ]
+
     def __str__(self):
         """
         Return the title as a string representation
@@ -0,0 +1,174 @@
+"""
+Unit tests for the cached token authentication.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.tests.helpers import create_user
+from user.authentication import token_cache_key, user_cache_key
+
+# Manage user endpoint, authenticated with the cached token authentication
+MANAGE_USER_URL = reverse('user:manage')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test suite for the cached token authentication."""
+
+    # Django creates a test client of this class for every test
+    client_class = APIClient
+
+    def setUp(self):
+        """Set up the test suite."""
+
+        # Clear the cached tokens of earlier tests
+        cache.clear()
+        # Create a user with a token
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        # Authenticate the client's requests with the token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_uncached_token_queries_token_and_user_once(self):
+        """
+        Test that a request with a token that is not cached gets
+        the token and its user in one query.
+        """
+
+        # Test that authenticating the token makes one query
+        with self.assertNumQueries(1):
+            response = self.client.get(MANAGE_USER_URL)
+
+        # Test that the user is authenticated
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the token's user is now cached
+        self.assertEqual(
+            cache.get(token_cache_key(self.token.key)), self.user.pk
+        )
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_cached_token_does_not_query_user(self):
+        """
+        Test that a request with a cached token does not query
+        the token or the user.
+        """
+
+        # Make a request, caching the token's user
+        self.client.get(MANAGE_USER_URL)
+
+        # Test that the second request makes no queries
+        with self.assertNumQueries(0):
+            response = self.client.get(MANAGE_USER_URL)
+
+        # Test that the user is authenticated from the cache
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_invalid_token_not_authenticated(self):
+        """Test that a request with an invalid token is not authenticated."""
+
+        # Authenticate with a token that does not exist
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        # Make a request with the invalid token
+        response = self.client.get(MANAGE_USER_URL)
+
+        # Test that the request is not authenticated
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_inactive_cached_user_not_authenticated(self):
+        """
+        Test that a request with a cached token of an inactive user
+        is not authenticated.
+        """
+
+        # Make a request, caching the token's user
+        self.client.get(MANAGE_USER_URL)
+        # Deactivate the cached user
+        values = cache.get(user_cache_key(self.user.pk))
+        values['is_active'] = False
+        cache.set(user_cache_key(self.user.pk), values)
+
+        # Make a request with the token
+        response = self.client.get(MANAGE_USER_URL)
+
+        # Test that the request is not authenticated
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_user_removes_cached_token(self):
+        """
+        Test that updating the user removes their cached token,
+        so the next request reads the updated user.
+        """
+
+        # Update the user, caching the token's user
+        response = self.client.patch(
+            MANAGE_USER_URL, {'first_name': 'Updated'}, format='json'
+        )
+        # Test that the update request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Test that the token's user is no longer cached
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        # Test that the next request returns the updated user
+        response = self.client.get(MANAGE_USER_URL)
+        self.assertEqual(response.data['first_name'], 'Updated')
+
+    def test_deleted_token_not_authenticated(self):
+        """
+        Test that deleting a cached token removes it from the cache,
+        so a request with the revoked token is not authenticated.
+        """
+
+        # Make a request, caching the token's user
+        self.client.get(MANAGE_USER_URL)
+        # Revoke the token
+        self.token.delete()
+
+        # Test that the token is no longer cached
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+        # Test that a request with the revoked token is not authenticated
+        response = self.client.get(MANAGE_USER_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_not_authenticated(self):
+        """
+        Test that deactivating a user outside the API (e.g. the admin)
+        removes their cached token, so their requests are not
+        authenticated.
+        """
+
+        # Make a request, caching the token's user
+        self.client.get(MANAGE_USER_URL)
+        # Deactivate the user with the ORM, testing that removing
+        # the cached user makes no query beyond the update
+        self.user.is_active = False
+        with self.assertNumQueries(1):
+            self.user.save()
+
+        # Test that the token's user is no longer cached
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        # Test that a request with the token is not authenticated
+        response = self.client.get(MANAGE_USER_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_not_authenticated(self):
+        """
+        Test that deleting a user removes their cached token,
+        so a request with their token is not authenticated.
+        """
+
+        # Make a request, caching the token's user
+        self.client.get(MANAGE_USER_URL)
+        # Delete the user, which deletes their token
+        self.user.delete()
+
+        # Test that the token is no longer cached
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+        # Test that a request with the token is not authenticated
+        response = self.client.get(MANAGE_USER_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,44 @@
+"""
+Unit tests for the test database.
+"""
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+
+# Introspection of the test database's tables
+introspection = connection.introspection
+
+
+class TestDatabaseTests(TestCase):
+    """
+    Test suite for the test database, which is built from the models
+    once and reused (--reuse-db, or cloned for each xdist worker).
+    """
+
+    def test_tables_match_models(self):
+        """
+        Test that every model's table has the model's columns, i.e.
+        the reused test database is not older than the models.
+        If this fails after changing a model, run pytest --create-db.
+        """
+
+        with connection.cursor() as cursor:
+            # Iterate over the models, and the many to many tables
+            for model in apps.get_models(include_auto_created=True):
+                # Tables of proxy and unmanaged models are not created
+                if model._meta.proxy or not model._meta.managed:
+                    continue
+
+                # Get the names of the columns of the model's table
+                columns = {
+                    column.name
+                    for column in introspection.get_table_description(
+                        cursor, model._meta.db_table
+                    )
+                }
+
+                # Test that the table has each of the model's columns
+                for field in model._meta.local_concrete_fields:
+                    with self.subTest(model=model._meta.label,
+                                      column=field.column):
+                        self.assertIn(field.column, columns)
@@ -0,0 +1,50 @@
+"""
+Unit tests for the password hashers.
+"""
+import importlib.util
+from unittest import skipUnless
+
+from django.contrib.auth.hashers import Argon2PasswordHasher, get_hasher
+from django.test import SimpleTestCase, override_settings
+
+from app.hashers import TunedArgon2PasswordHasher
+
+# The password hashers of the settings, without the test hasher
+PASSWORD_HASHERS = [
+    'app.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
+@override_settings(PASSWORD_HASHERS=PASSWORD_HASHERS)
+class TunedArgon2PasswordHasherTests(SimpleTestCase):
+    """Test suite for the tuned Argon2 password hasher."""
+
+    def test_argon2_hashes_use_tuned_hasher(self):
+        """
+        Test that passwords hashed with argon2 are checked
+        by the tuned hasher.
+        """
+
+        # Test that the argon2 algorithm's hasher is the tuned hasher
+        self.assertIsInstance(get_hasher('argon2'), TunedArgon2PasswordHasher)
+
+    # The hasher needs argon2-cffi to hash passwords
+    @skipUnless(
+        importlib.util.find_spec('argon2'), 'argon2-cffi is not installed'
+    )
+    def test_default_cost_hash_must_update(self):
+        """
+        Test that a password hashed with Django's default Argon2 costs
+        is rehashed with the tuned costs.
+        """
+
+        # Hash a password with Django's default Argon2 hasher
+        hasher = Argon2PasswordHasher()
+        encoded = hasher.encode('ThirtyHairyHippos896', hasher.salt())
+
+        # Test that the tuned hasher rehashes the password
+        self.assertTrue(get_hasher('argon2').must_update(encoded))
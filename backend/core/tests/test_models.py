@@ -3,6 +3,7 @@ Unit tests for models.
 """
 from django.test import TestCase
 
+from core.models import Topic
 from core.tests.helpers import (
     create_user,
     create_superuser,
@@ -109,6 +110,26 @@ class ModelTests(TestCase):
         # Test that the last_modified DataTime field is not None
         self.assertIsNotNone(topic.last_modified)
 
+    def test_topics_for_user(self):
+        """
+        Test that the topic manager returns the user's topics
+        ordered by most recently created.
+        """
+
+        # Create a user and another user
+        user = create_user()
+        other_user = create_user(email='other@example.com')
+
+        # Create two topics for the user and one for the other user
+        first = create_topic(user=user)
+        second = create_topic(user=user)
+        create_topic(user=other_user)
+
+        # Test that only the user's topics are returned, newest first
+        self.assertEqual(
+            list(Topic.objects.for_user(user)), [second, first]
+        )
+
     def test_create_tag_success(self):
         """Test creating a new tag is successful."""
 
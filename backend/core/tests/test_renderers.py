@@ -0,0 +1,65 @@
+"""
+Unit tests for the API renderers.
+"""
+import datetime
+import json
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from app.renderers import ORJSONRenderer
+from user.views import ManageUserView
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    """Test suite for the orjson renderer."""
+
+    def test_render_matches_drf_json_renderer(self):
+        """
+        Test that the orjson renderer renders the same JSON
+        as DRF's JSON renderer.
+        """
+
+        # Data with the types the API responses contain
+        data = {
+            'id': 1,
+            'title': 'Test Topic\u2028',
+            'last_modified': datetime.datetime(
+                2023, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+            ),
+            'tags': [{'id': 1, 'name': 'Test Tag'}],
+            'detail': ErrorDetail('Not found.', code='not_found'),
+            'message': gettext_lazy('Test message'),
+            'notes': None,
+            # List field errors are keyed by the item's index
+            'errors': {0: ['Invalid item.']}
+        }
+
+        # Render the data with both renderers
+        rendered = ORJSONRenderer().render(data)
+        expected = JSONRenderer().render(data)
+
+        # Test that the rendered JSON has the same content
+        self.assertEqual(json.loads(rendered), json.loads(expected))
+        # Test that the line separator is escaped
+        self.assertIn(b'\\u2028', rendered)
+
+    def test_render_none_returns_empty_body(self):
+        """Test that rendering no data returns an empty body."""
+
+        # Test that no data renders as an empty bytestring
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_api_renders_json_with_orjson_by_default(self):
+        """Test that the API views render JSON with orjson by default."""
+
+        # Call the manage user view directly, without authentication
+        request = APIRequestFactory().get('/', format='json')
+        response = ManageUserView.as_view()(request)
+
+        # Test that the response was rendered with the orjson renderer
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
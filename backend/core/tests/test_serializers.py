@@ -0,0 +1,135 @@
+"""
+Unit tests for the base serializers.
+"""
+from django.test import SimpleTestCase
+
+from rest_framework import serializers
+
+from app.serializers import (
+    CachedFieldsSerializer,
+    CachedFieldsModelSerializer
+)
+from core.models import Tag
+
+
+class ItemSerializer(serializers.Serializer):
+    """Minimal nested serializer."""
+
+    name = serializers.CharField()
+
+
+class ParentSerializer(CachedFieldsSerializer):
+    """Minimal serializer with cached fields and a nested list."""
+
+    title = serializers.CharField(max_length=10)
+    items = ItemSerializer(many=True)
+
+
+class ExtendedParentSerializer(ParentSerializer):
+    """Subclass of the minimal serializer with an extra field."""
+
+    notes = serializers.CharField()
+
+
+class TagSerializer(CachedFieldsModelSerializer):
+    """Minimal model serializer with cached fields."""
+
+    class Meta:
+        """Meta class allows for validation rules for the data"""
+
+        model = Tag
+        fields = ('id', 'name')
+        extra_kwargs = {'name': {'write_only': True}}
+
+
+class CachedFieldsMixinTests(SimpleTestCase):
+    """Test suite for the serializers that build their fields once."""
+
+    def test_fields_not_shared(self):
+        """
+        Test that serializers built from the cached fields each
+        get their own fields, bound to their own serializer.
+        """
+
+        # Create two serializers
+        first = ParentSerializer()
+        second = ParentSerializer()
+
+        # Test that the serializers do not share the fields
+        self.assertIsNot(first.fields['title'], second.fields['title'])
+        # Test that each field is bound to its own serializer
+        self.assertIs(first.fields['title'].parent, first)
+        self.assertIs(second.fields['title'].parent, second)
+
+    def test_nested_list_child_not_shared(self):
+        """
+        Test that nested list serializers each get their own child,
+        which reads its own serializer's context.
+        """
+
+        # Create two serializers with different contexts
+        first = ParentSerializer(context={'name': 'first'})
+        second = ParentSerializer(context={'name': 'second'})
+
+        # Test that the serializers do not share the nested fields
+        self.assertIsNot(first.fields['items'], second.fields['items'])
+        self.assertIsNot(
+            first.fields['items'].child, second.fields['items'].child
+        )
+        # Test that the nested fields read their own serializer's context
+        self.assertEqual(
+            first.fields['items'].child.context, {'name': 'first'}
+        )
+        self.assertEqual(
+            second.fields['items'].child.context, {'name': 'second'}
+        )
+
+    def test_validators_frozen(self):
+        """
+        Test that the copies of a field share its validators,
+        which are frozen so no serializer can change them.
+        """
+
+        # Create two serializers
+        first = ParentSerializer()
+        second = ParentSerializer()
+
+        # Test that the fields share the validators, which can't change
+        self.assertIs(
+            first.fields['title'].validators,
+            second.fields['title'].validators
+        )
+        self.assertIsInstance(first.fields['title'].validators, tuple)
+        # Test that the validators still run
+        self.assertFalse(
+            ParentSerializer(data={'title': 'a' * 11, 'items': []}).is_valid()
+        )
+
+    def test_subclass_builds_own_fields(self):
+        """
+        Test that a subclass builds its own fields
+        rather than reusing its parent's cached fields.
+        """
+
+        # Build the parent's fields first
+        ParentSerializer().fields
+
+        # Test that each class has its own fields
+        self.assertNotIn('notes', ParentSerializer().fields)
+        self.assertIn('notes', ExtendedParentSerializer().fields)
+
+    def test_model_serializer_keeps_extra_kwargs(self):
+        """
+        Test that the model fields built once keep the
+        options of the serializer's extra_kwargs.
+        """
+
+        # Create two model serializers
+        first = TagSerializer()
+        second = TagSerializer()
+
+        # Test that the serializers do not share the fields
+        self.assertIsNot(first.fields['name'], second.fields['name'])
+        # Test that the extra kwargs are applied to both
+        self.assertTrue(first.fields['name'].write_only)
+        self.assertTrue(second.fields['name'].write_only)
@@ -1,7 +1,12 @@
 """
 Unit tests for the topic API.
 """
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -13,9 +18,10 @@ from core.tests.helpers import (
     create_tag,
     create_resource,
     create_question,
-    topic_details_url
+    topic_details_url,
+    tag_details_url
 )
-from core.models import Topic
+from core.models import Topic, Tag, Question
 
 from topic.serializers import (
     TopicSerializer,
@@ -63,6 +69,8 @@ class PrivateTopicApiTests(TestCase):
     def setUp(self):
         """Set up the test suite."""
 
+        # Clear the cached topic lists of earlier tests
+        cache.clear()
         # Create a test client to make test http requests
         self.client = APIClient()
         # Create a test user
@@ -99,10 +107,10 @@ class PrivateTopicApiTests(TestCase):
         # Test that the get topics request was successful
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Test that there are 2 topics in the response
-        self.assertEqual(len(response.data), 2)
-        # Test that the topics in the response match
+        self.assertEqual(response.data['count'], 2)
+        # Test that the topics in the response's page match
         # the serialized topics from the database
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_list_topics_limited_to_user(self):
         """
@@ -128,10 +136,145 @@ class PrivateTopicApiTests(TestCase):
         # Test that the get topics request was successful
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         # Test that there is 1 topic in the response
-        self.assertEqual(len(response.data), 1)
-        # Test that the topics in the response match
+        self.assertEqual(response.data['count'], 1)
+        # Test that the topics in the response's page match
         # the serialized topics from the database
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
+
+    def test_list_topics_paginated(self):
+        """
+        Test that the topics list is paginated and the page size
+        the client asks for is capped.
+        """
+
+        # Create more test topics for the user than the maximum page size
+        Topic.objects.bulk_create(
+            Topic(user=self.user, title=f'Topic {i}') for i in range(101)
+        )
+
+        # Retrieve the topics asking for a page larger than the maximum
+        response = self.client.get(TOPICS_URL, {'page_size': 1000})
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that all the topics are counted
+        self.assertEqual(response.data['count'], 101)
+        # Test that the page is limited to the maximum page size
+        self.assertEqual(len(response.data['results']), 100)
+        # Test that there is a link to the next page
+        self.assertIsNotNone(response.data['next'])
+
+    def test_list_topics_query_count(self):
+        """
+        Test that listing topics uses the same number of queries
+        however many topics and topic attributes there are.
+        """
+
+        # Create three test topics for the user,
+        # each with a tag, a resource and a question
+        for _ in range(3):
+            topic = create_topic(user=self.user)
+            topic.tags.add(create_tag(user=self.user))
+            topic.resources.add(create_resource(user=self.user))
+            topic.questions.add(create_question(user=self.user))
+
+        # Test that the topics are counted and retrieved with one query
+        # each and one query each for their tags, resources and questions
+        with self.assertNumQueries(5):
+            response = self.client.get(TOPICS_URL)
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that there are 3 topics in the response
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_list_topics_match_topic_serializer(self):
+        """
+        Test that the listed topics with their attributes match
+        the topics serialized by the topic serializer.
+        """
+
+        # Create a test topic for the user with one of each attribute
+        topic = create_topic(user=self.user)
+        topic.tags.add(create_tag(user=self.user))
+        topic.resources.add(create_resource(user=self.user))
+        topic.questions.add(create_question(user=self.user))
+
+        # Retrieve the topics
+        response = self.client.get(TOPICS_URL)
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the listed topic matches the serialized topic
+        self.assertEqual(
+            response.data['results'], [TopicSerializer(topic).data]
+        )
+
+    def test_list_topics_cached_until_topics_change(self):
+        """
+        Test that a listed page of topics is cached, and listed again
+        once the user's topics change.
+        """
+
+        # Create a test topic for the user and list the topics
+        create_topic(user=self.user)
+        self.client.get(TOPICS_URL)
+
+        # Test that listing the topics again makes no queries
+        with self.assertNumQueries(0):
+            response = self.client.get(TOPICS_URL)
+        # Test that the cached page has the topic
+        self.assertEqual(response.data['count'], 1)
+
+        # Create another topic for the user
+        self.client.post(TOPICS_URL, self.payload, format='json')
+        # List the topics
+        response = self.client.get(TOPICS_URL)
+
+        # Test that the new topic is listed
+        self.assertEqual(response.data['count'], 2)
+
+    def test_list_topics_does_not_load_notes(self):
+        """
+        Test that listing topics does not load the topic notes,
+        which are only in the topic detail.
+        """
+
+        # Create a test topic for the user
+        create_topic(user=self.user)
+
+        # Retrieve the topics, capturing the queries
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(TOPICS_URL)
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that no query selects the notes column
+        for query in queries:
+            self.assertNotIn('"notes"', query['sql'])
+
+    def test_topic_serializer_fields_not_shared(self):
+        """
+        Test that topic serializers built from the cached fields
+        each get their own fields, bound to their own context.
+        """
+
+        # Create two topic serializers with different contexts
+        first = TopicSerializer(context={'name': 'first'})
+        second = TopicSerializer(context={'name': 'second'})
+
+        # Test that the serializers do not share the nested fields
+        self.assertIsNot(first.fields['tags'], second.fields['tags'])
+        self.assertIsNot(
+            first.fields['tags'].child, second.fields['tags'].child
+        )
+        # Test that the nested fields read their own serializer's context
+        self.assertEqual(
+            first.fields['tags'].child.context, {'name': 'first'}
+        )
+        self.assertEqual(
+            second.fields['tags'].child.context, {'name': 'second'}
+        )
 
     def test_get_topic_detail_success(self):
         """
@@ -153,6 +296,103 @@ class PrivateTopicApiTests(TestCase):
         # the serialized topic from the database
         self.assertEqual(response.data, serializer.data)
 
+    def test_get_topic_detail_query_count(self):
+        """
+        Test that retrieving a topic detail uses one query for the topic
+        and one query each for its tags, resources and questions.
+        """
+
+        # Create a test topic for the user with two of each attribute
+        topic = create_topic(user=self.user)
+        for i in range(2):
+            topic.tags.add(create_tag(user=self.user, name=f'Tag {i}'))
+            topic.resources.add(
+                create_resource(user=self.user, name=f'Resource {i}')
+            )
+            topic.questions.add(
+                create_question(user=self.user, name=f'Question {i}')
+            )
+
+        # Test that the topic detail is retrieved with four queries
+        with self.assertNumQueries(4):
+            response = self.client.get(topic_details_url(topic.id))
+
+        # Test that the get topic request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the topic's attributes are in the response
+        self.assertEqual(len(response.data['tags']), 2)
+        self.assertEqual(len(response.data['resources']), 2)
+        self.assertEqual(len(response.data['questions']), 2)
+
+    def test_get_topic_detail_not_modified(self):
+        """
+        Test that retrieving a topic detail with its current ETag
+        returns 304 NOT MODIFIED, with one query for the topic.
+        """
+
+        # Create a test topic for the user
+        topic = create_topic(user=self.user)
+        url = topic_details_url(topic.id)
+        # Retrieve the topic and its ETag
+        etag = self.client.get(url)['ETag']
+
+        # Test that retrieving the topic with the ETag makes one query
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        # Test that the topic was not modified
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Test that the response has the same ETag
+        self.assertEqual(response['ETag'], etag)
+
+    def test_get_topic_detail_modified_by_tag_update(self):
+        """
+        Test that updating one of a topic's tags changes the topic's ETag.
+        """
+
+        # Create a test topic for the user with a tag
+        topic = create_topic(user=self.user)
+        tag = create_tag(user=self.user)
+        topic.tags.add(tag)
+        url = topic_details_url(topic.id)
+        # Retrieve the topic and its ETag
+        etag = self.client.get(url)['ETag']
+
+        # Rename the tag
+        self.client.patch(
+            tag_details_url(tag.id), {'name': 'Renamed'}, format='json'
+        )
+        # Retrieve the topic with the old ETag
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        # Test that the topic is returned with the renamed tag
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tags'][0]['name'], 'Renamed')
+        # Test that the topic has a new ETag
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_topic_detail_serializer_reuses_prefetched_attributes(self):
+        """
+        Test that the topic detail serializer does not query
+        the attributes of a topic that already has them prefetched.
+        """
+
+        # Create a test topic for the user with a tag
+        topic = create_topic(user=self.user)
+        topic.tags.add(create_tag(user=self.user))
+
+        # Retrieve the topic with its attributes prefetched
+        topic = Topic.objects.prefetch_related(
+            'tags', 'resources', 'questions'
+        ).get(id=topic.id)
+
+        # Test that serializing the topic makes no queries
+        with self.assertNumQueries(0):
+            data = TopicDetailSerializer(topic).data
+
+        # Test that the tag is in the serialized topic
+        self.assertEqual(len(data['tags']), 1)
+
     def test_create_topic_success(self):
         """
         Test creating a topic is successful.
@@ -176,6 +416,79 @@ class PrivateTopicApiTests(TestCase):
         # Test that the topic's user is the authenticated user
         self.assertEqual(topic.user, self.user)
 
+    def test_create_topic_rolled_back_on_error(self):
+        """
+        Test that a topic and its attributes are not saved
+        if saving any of them fails.
+        """
+
+        # Topic payload with a tag and a question
+        payload = {
+            **self.payload,
+            'tags': [{'name': 'Test Tag'}],
+            'questions': [{'name': 'Question', 'answer': 'Answer'}]
+        }
+
+        # Make creating the questions fail, after the topic
+        # and its tags have been created
+        with patch.object(
+                Question.objects, 'bulk_create', side_effect=IntegrityError):
+            # Test that the create topic request raises the error
+            with self.assertRaises(IntegrityError):
+                self.client.post(TOPICS_URL, payload, format='json')
+
+        # Test that the topic and its tag were rolled back
+        self.assertFalse(Topic.objects.filter(user=self.user).exists())
+        self.assertFalse(Tag.objects.filter(user=self.user).exists())
+
+    def test_create_topic_query_count(self):
+        """
+        Test that creating a topic uses the same number of queries
+        however many tags, resources and questions it is created with.
+        """
+
+        def topic_payload(count):
+            """Return a topic payload with count of each attribute."""
+
+            return {
+                **self.payload,
+                'tags': [{'name': f'Tag {n}'} for n in range(count)],
+                'resources': [
+                    {'name': f'Resource {n}', 'link': 'https://example.com'}
+                    for n in range(count)
+                ],
+                'questions': [
+                    {'name': f'Question {n}', 'answer': 'Answer',
+                     'wrong_answers': ['Wrong Answer']}
+                    for n in range(count)
+                ]
+            }
+
+        # Create a topic with one of each attribute,
+        # recording the queries the request runs
+        with CaptureQueriesContext(connection) as single_queries:
+            response = self.client.post(
+                TOPICS_URL, topic_payload(1), format='json'
+            )
+        # Test that the create topic post request was successful
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Create a topic with five of each attribute,
+        # recording the queries the request runs
+        with CaptureQueriesContext(connection) as many_queries:
+            response = self.client.post(
+                TOPICS_URL, topic_payload(5), format='json'
+            )
+        # Test that the create topic post request was successful
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Test that all the attributes were added to the topic
+        self.assertEqual(len(response.data['tags']), 5)
+        self.assertEqual(len(response.data['resources']), 5)
+        self.assertEqual(len(response.data['questions']), 5)
+
+        # Test that both requests ran the same number of queries
+        self.assertEqual(len(many_queries), len(single_queries))
+
     def test_patch_topic_success(self):
         """
         Test partially updating a topic is successful.
@@ -331,11 +644,85 @@ class PrivateTopicApiTests(TestCase):
 
         # Test that the two topics with the params tags
         # are in the response's filtered topics
-        self.assertIn(serialized1.data, response.data)
-        self.assertIn(serialized2.data, response.data)
+        self.assertIn(serialized1.data, response.data['results'])
+        self.assertIn(serialized2.data, response.data['results'])
         # Test that the topic without the params tags
         # is not in the response's filtered topics
-        self.assertNotIn(serialized3.data, response.data)
+        self.assertNotIn(serialized3.data, response.data['results'])
+
+    def test_filter_topics_by_tags_returns_each_topic_once(self):
+        """
+        Test that a topic with more than one of the filtered tags
+        is only returned once.
+        """
+
+        # Create a test topic for the user with two tags
+        topic = create_topic(user=self.user)
+        tag1 = create_tag(user=self.user, name='Tag 1')
+        tag2 = create_tag(user=self.user, name='Tag 2')
+        topic.tags.add(tag1, tag2)
+
+        # Retrieve the topics filtered by both tags
+        response = self.client.get(
+            TOPICS_URL, {'tags': f'{tag1.id},{tag2.id}'}
+        )
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the topic is in the response once
+        self.assertEqual(
+            [item['id'] for item in response.data['results']], [topic.id]
+        )
+
+    def test_filter_topics_ignores_non_numeric_ids(self):
+        """
+        Test that non numeric ids in a filter are ignored.
+        """
+
+        # Create a test topic for the user with a tag
+        topic = create_topic(user=self.user)
+        tag = create_tag(user=self.user)
+        topic.tags.add(tag)
+
+        # Retrieve the topics filtered by the tag and invalid ids
+        response = self.client.get(TOPICS_URL, {'tags': f'abc,{tag.id},,'})
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the topic with the tag is in the response
+        self.assertEqual(
+            [item['id'] for item in response.data['results']], [topic.id]
+        )
+
+    def test_filter_topics_cap_drops_cut_id(self):
+        """
+        Test that an id cut in two by the filter length cap
+        is dropped rather than filtered by as a different id.
+        """
+
+        # Create a test topic for the user with a tag
+        topic = create_topic(user=self.user)
+        tag = create_tag(user=self.user)
+        topic.tags.add(tag)
+
+        # A filter whose cap falls right after the tag id,
+        # in the middle of a longer id
+        tags = ',' * (4096 - len(str(tag.id))) + f'{tag.id}5'
+        # Retrieve the topics filtered by the over long filter
+        response = self.client.get(TOPICS_URL, {'tags': tags})
+
+        # Test that the get topics request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the cut id did not match the tag
+        self.assertEqual(response.data['results'], [])
+
+        # Retrieve the topics with the same filter ending at the cap
+        response = self.client.get(TOPICS_URL, {'tags': tags[:-1]})
+
+        # Test that an id ending at the cap is kept
+        self.assertEqual(
+            [item['id'] for item in response.data['results']], [topic.id]
+        )
 
     def test_filter_topics_by_resources(self):
         """
@@ -372,11 +759,11 @@ class PrivateTopicApiTests(TestCase):
 
         # Test that the two topics with the params resources
         # are in the response's filtered topics
-        self.assertIn(serialized1.data, response.data)
-        self.assertIn(serialized2.data, response.data)
+        self.assertIn(serialized1.data, response.data['results'])
+        self.assertIn(serialized2.data, response.data['results'])
         # Test that the topic without the params resources
         # is not in the response's filtered topics
-        self.assertNotIn(serialized3.data, response.data)
+        self.assertNotIn(serialized3.data, response.data['results'])
 
     def test_filter_topics_by_questions(self):
         """
@@ -413,8 +800,8 @@ class PrivateTopicApiTests(TestCase):
 
         # Test that the two topics with the params questions
         # are in the response's filtered topics
-        self.assertIn(serialized1.data, response.data)
-        self.assertIn(serialized2.data, response.data)
+        self.assertIn(serialized1.data, response.data['results'])
+        self.assertIn(serialized2.data, response.data['results'])
         # Test that the topic without the params questions
         # is not in the response's filtered topics
-        self.assertNotIn(serialized3.data, response.data)
+        self.assertNotIn(serialized3.data, response.data['results'])
@@ -108,6 +108,92 @@ class PrivateTopicQuestionsApiTests(TestCase):
                 ).exists()
             )
 
+    def test_create_topic_with_different_question_answer_creates_question(
+            self):
+        """
+        Test creating a topic with a question that only shares its name
+        with an existing question creates a new question.
+        """
+
+        # Create an existing question with the same name as the
+        # first payload question but a different answer
+        existing_question = create_question(
+            user=self.user,
+            name='Payload Question',
+            answer='Different Answer'
+        )
+
+        # Post the payload
+        response = self.client.post(TOPICS_URL, self.payload, format='json')
+
+        # Test that the request was successful
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Get the topic created from the database
+        topic = Topic.objects.get(id=response.data['id'])
+
+        # Check that the existing question was not added to the topic
+        self.assertNotIn(existing_question, topic.questions.all())
+        # Check that the user has the existing question
+        # and the two payload questions
+        self.assertEqual(
+            Question.objects.filter(user=self.user).count(), 3
+        )
+
+    def test_create_topic_with_invalid_wrong_answer_error(self):
+        """
+        Test creating a topic with a question wrong answer that is
+        too long returns the validation errors, keyed by the item.
+        """
+
+        # Payload with a wrong answer longer than the maximum length
+        payload = {
+            'title': 'Payload Topic',
+            'questions': [{
+                'name': 'Payload Question',
+                'answer': 'Payload Answer',
+                'wrong_answers': ['x' * 300]
+            }]
+        }
+
+        # Post the payload
+        response = self.client.post(TOPICS_URL, payload, format='json')
+
+        # Test that the response is 400 BAD REQUEST
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Test that the error of the wrong answer is rendered,
+        # keyed by the wrong answer's index as a string
+        self.assertIn(
+            '0', response.json()['questions'][0]['wrong_answers']
+        )
+        # Test that no topic was created
+        self.assertFalse(Topic.objects.exists())
+
+    def test_create_topic_with_duplicate_questions_creates_one_question(
+            self):
+        """
+        Test creating a topic with the same question passed in twice
+        creates the question once.
+        """
+
+        # Payload with the first question passed in twice
+        payload = {
+            'title': 'Payload Topic',
+            'questions': [self.payload['questions'][0]] * 2
+        }
+
+        # Post the payload
+        response = self.client.post(TOPICS_URL, payload, format='json')
+
+        # Test that the request was successful
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # Test that the question was created once
+        self.assertEqual(
+            Question.objects.filter(user=self.user).count(), 1
+        )
+        # Test that the topic has the question once
+        self.assertEqual(len(response.data['questions']), 1)
+
     def test_create_question_on_topic_patch(self):
         """
         Test creating a new question when patching a topic.
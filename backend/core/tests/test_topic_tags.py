@@ -1,7 +1,9 @@
 """
 Unit tests for creating and assigning Tags to topics.
 """
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -142,6 +144,37 @@ class PrivateTopicTagsApiTests(TestCase):
         # because it has been replaced by the different tag
         self.assertNotIn(original_tag, topic.tags.all())
 
+    def test_patch_topic_with_unchanged_tags_writes_no_tags(self):
+        """
+        Test patching a topic with the tags it already has
+        does not delete or add any topic tags.
+        """
+
+        # Create a topic with a tag
+        topic = create_topic(user=self.user)
+        tag = create_tag(user=self.user)
+        topic.tags.add(tag)
+
+        # Create a payload with the topic's tag name
+        payload = {'tags': [{'name': tag.name}]}
+        # Get the topic details url
+        url = topic_details_url(topic.id)
+        # Update the topic details with the payload,
+        # recording the queries the request runs
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, payload, format='json')
+
+        # Check that the request was successful
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Check that the topic still has the tag
+        self.assertEqual(list(topic.tags.all()), [tag])
+        # Check that no topic tags were deleted or added
+        self.assertFalse(any(
+            query['sql'].startswith(('DELETE', 'INSERT'))
+            and 'core_topic_tags' in query['sql']
+            for query in queries
+        ))
+
     def test_clear_topic_tags(self):
         """
         Test clearing a topic's tags.
@@ -1,129 +1,129 @@
 """
 Unit tests for the user API.
 """
-from django.test import TestCase
-from django.contrib.auth import get_user_model
-from django.urls import reverse
+from types import MappingProxyType
+from unittest.mock import Mock, patch
 
-from rest_framework.test import APIClient
+from django.test import SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    make_password
+)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
 
 from core.tests.helpers import create_user
-
-# User API URL endpoint constants
-CREATE_USER_URL = reverse('user:create')
-TOKEN_URL = reverse('user:token')
-MANAGE_USER_URL = reverse('user:manage')
-
-
-class PublicUserApiTests(TestCase):
-    """Test suite for the user API (public access)."""
-
-    def setUp(self):
-        """Set up the test suite."""
-
-        # Create a test client to make test http requests
-        self.client = APIClient()
-        # Payload for user API requests
-        self.payload = {
-            'email': 'user@example.com',
-            'password': 'ThirtyHairyHippos896',
-            'first_name': 'Test',
-            'last_name': 'User'
-        }
-
-    def test_create_user_success(self):
-        """Test creating a user is successful."""
-
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 201 CREATED
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-
-        # Test that the user was created successfully
-        # Get the user the database with the email passed from payload
-        user = get_user_model().objects.get(email=self.payload['email'])
-
-        # Test that the user's password is correct
-        self.assertTrue(user.check_password(self.payload['password']))
-        # Test that the key password is not returned in the response
-        self.assertNotIn('password', response.data)
-
-        # Get the user's stored hashed password
-        # Let Django handle the password hashing
-        stored_password = user.password
-
-        # Test that the stored password is not the same as the
-        # password passed in the payload
-        self.assertNotEqual(stored_password, self.payload['password'])
-
-    def test_create_user_with_email_exists_error(self):
-        """
-        Test that trying to create a user with an email that already exists
-        in the database returns a  400 bad request message in the response.
-        """
-
-        # Create a user in the database with
-        # the details in the payload
-        create_user(**self.payload)
-
-        # Make a POST request to the create user endpoint with the
-        # same user details, including the email address
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the email already exists error code is returned
-        self.assertEqual(
-            response.data['email'][0].code, 'unique'
-        )
-
-    def test_create_user_with_invalid_email_format_error(self):
-        """
-        Test that trying to create a user with an invalid email format
-        returns an error.
-        """
-
-        # List of invalid emails
-        invalid_emails = [
-            "userexamplecom",
-            "user@examplecom",
-            "userexample.com"
-        ]
-
-        # Loop through the invalid emails
-        for invalid_email in invalid_emails:
-
-            # Update the payload with an invalid email format
-            self.payload['email'] = 'invalid_email_format'
-            # Make a POST request to the create user endpoint
-            response = self.client.post(CREATE_USER_URL, self.payload)
-
-            # Test that the response is 400 BAD REQUEST
-            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-            # Test that the invalid error code is returned
-            self.assertEqual(
-                response.data['email'][0].code, 'invalid'
-            )
-
-    def test_create_user_with_long_email_error(self):
-        """
-        Test that trying to create a user with an email longer than 254
-        characters returns an error.
-        """
-
-        # Update the payload with a long email
-        self.payload['email'] = 'a' * 255 + '@example.com'
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the max_length error code is returned
-        self.assertEqual(
-            response.data['email'][0].code, 'max_length'
-        )
+from user.serializers import TokenSerializer, UserSerializer
+from user.views import CreateTokenView, CreateUserView, ManageUserView
+
+# User API URL endpoint constants, resolved lazily on first use
+# so collecting the tests does not load the URL configuration
+CREATE_USER_URL = reverse_lazy('user:create')
+TOKEN_URL = reverse_lazy('user:token')
+MANAGE_USER_URL = reverse_lazy('user:manage')
+
+# Payload for user API requests. Read-only so no test can change it
+# for the others, tests build their own payload from it instead
+BASE_PAYLOAD = MappingProxyType({
+    'email': 'user@example.com',
+    'password': 'ThirtyHairyHippos896',
+    'first_name': 'Test',
+    'last_name': 'User'
+})
+# Credentials for token requests, the only two fields the token
+# serializer reads. The email is the existing user's in the tests
+TOKEN_PAYLOAD = MappingProxyType({
+    'email': 'existing@example.com',
+    'password': BASE_PAYLOAD['password']
+})
+
+# Invalid user field values and the error code the user serializer
+# returns for each, as (field, value, code)
+CASES = [
+    ('email', 'userexamplecom', 'invalid'),
+    ('email', 'user@examplecom', 'invalid'),
+    ('email', 'userexample.com', 'invalid'),
+    ('email', 'a' * 255 + '@example.com', 'max_length'),
+    ('password', 'a' * 129, 'max_length'),
+    ('password', 'iloveyou', 'password_too_common'),
+    ('password', '284527272381290', 'password_entirely_numeric'),
+    ('password', '', 'blank'),
+    ('first_name', 'a' * 151, 'max_length'),
+    ('first_name', '', 'blank'),
+    ('last_name', 'a' * 151, 'max_length'),
+    ('last_name', '', 'blank'),
+]
+# Fields missing from the user payload and the error code
+# the user serializer returns for each, as (field, code)
+POP_CASES = [
+    ('password', 'required'),
+    ('first_name', 'required'),
+    ('last_name', 'required'),
+]
+
+# Invalid token request field values and the error code
+# the token endpoint returns for each, as (field, value, code)
+TOKEN_CASES = [
+    ('email', '', 'blank'),
+    ('password', '', 'blank'),
+]
+# Fields missing from the token request and the error code
+# the token endpoint returns for each, as (field, code)
+TOKEN_POP_CASES = [
+    ('email', 'required'),
+    ('password', 'required'),
+]
+
+
+def payload_without(field, payload=BASE_PAYLOAD):
+    """Return a copy of the payload without the given field."""
+
+    return {key: value for key, value in payload.items()
+            if key != field}
+
+
+class PublicUserApiNoDbTests(SimpleTestCase):
+    """
+    Test suite for the user API (public access).
+    Requests rejected by the serializer or the authentication
+    before the database is queried.
+    """
+
+    # Fail any test in the suite that queries the database
+    databases = set()
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up the test suite once for the class."""
+
+        super().setUpClass()
+        # Create a request factory to call the view directly,
+        # skipping the middleware and URL routing
+        cls.factory = APIRequestFactory()
+
+    def _post_create_user(self, payload):
+        """Call the create user view directly and return the response."""
+
+        # Build a POST request to the create user endpoint
+        request = self.factory.post(CREATE_USER_URL, payload, format='json')
+        # Call the view directly with the request
+        return CreateUserView.as_view()(request)
+
+    def _post_create_token(self, payload):
+        """Call the create token view directly and return the response."""
+
+        # Build a POST request to the create token endpoint
+        request = self.factory.post(TOKEN_URL, payload, format='json')
+        # Call the view directly with the request
+        return CreateTokenView.as_view()(request)
 
     def test_create_user_with_an_empty_email_error(self):
         """
@@ -131,10 +131,10 @@ class PublicUserApiTests(TestCase):
         string email returns an error.
         """
 
-        # Update the payload with an empty email
-        self.payload['email'] = ''
+        # Payload with an empty email
+        payload = {**BASE_PAYLOAD, 'email': ''}
         # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        response = self._post_create_user(payload)
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -149,10 +149,10 @@ class PublicUserApiTests(TestCase):
         returns an error.
         """
 
-        # Remove the email from the payload
-        self.payload.pop('email')
+        # Payload without the email
+        payload = payload_without('email')
         # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        response = self._post_create_user(payload)
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -161,245 +161,216 @@ class PublicUserApiTests(TestCase):
             response.data['email'][0].code, 'required'
         )
 
-    def test_create_user_with_short_password_error(self):
+    # Report the email as taken without querying the database
+    @patch('rest_framework.validators.qs_exists', return_value=True)
+    def test_create_user_with_email_exists_error(self, mock_qs_exists):
         """
-        Test that trying to create a user with a password less than 8
-        characters returns an error and the user is not in the database.
+        Test that trying to create a user with an email that already exists
+        in the database returns a  400 bad request message in the response.
         """
 
-        # Update the payload with a password less than 8 characters
-        self.payload['password'] = 'short'
         # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        response = self._post_create_user(BASE_PAYLOAD)
 
+        # Test that the email unique validator checked the database
+        mock_qs_exists.assert_called_once()
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the password too short error code is returned
+        # Test that the email already exists error code is returned
         self.assertEqual(
-            response.data['password'][0].code, 'password_too_short'
+            response.data['email'][0].code, 'unique'
         )
 
-        # Check if the user exists (boolean) by trying to get the
-        # user in the database with the email passed from payload
-        user_exists = get_user_model().objects.filter(
-            email=self.payload['email']
-        ).exists()
-
-        # Test that the user does not exist (False)
-        self.assertFalse(user_exists)
-
-    def test_create_user_with_long_password_error(self):
-        """
-        Test that trying to create a user with a password more than 128
-        characters returns an error.
-        """
-
-        # Update the payload with a password more than 128 characters
-        self.payload['password'] = 'a' * 129
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the max_length error code is returned
-        self.assertEqual(
-            response.data['password'][0].code, 'max_length'
-        )
+    def test_create_token_field_errors(self):
+        """
+        Test that trying to create a token with an empty or missing
+        email or password returns an error.
+        """
+
+        # Loop through the invalid values
+        for field, value, code in TOKEN_CASES:
+            # Report each invalid value as its own failure
+            with self.subTest(field=field, code=code):
+
+                # Copy the payload with the invalid value
+                payload = {**TOKEN_PAYLOAD, field: value}
+                # Make a POST request to the create token endpoint
+                response = self._post_create_token(payload)
+
+                # Test that the response is 400 BAD REQUEST
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                # Test that the token was not created
+                self.assertNotIn('token', response.data)
+                # Test that the expected error code is returned
+                self.assertEqual(response.data[field][0].code, code)
+
+        # Loop through the missing fields
+        for field, code in TOKEN_POP_CASES:
+            # Report each missing field as its own failure
+            with self.subTest(field=field, code=code):
+
+                # Copy the payload without the field
+                payload = payload_without(field, TOKEN_PAYLOAD)
+                # Make a POST request to the create token endpoint
+                response = self._post_create_token(payload)
+
+                # Test that the response is 400 BAD REQUEST
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                # Test that the token was not created
+                self.assertNotIn('token', response.data)
+                # Test that the expected error code is returned
+                self.assertEqual(response.data[field][0].code, code)
 
-    def test_create_user_with_common_password_error(self):
+    def test_authentication_required_for_user(self):
         """
-        Test that trying to create a user with
-        a common password returns an error.
+        Test that authentication is required for users.
         """
 
-        # Update the payload with a common password
-        self.payload['password'] = 'iloveyou'
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        # Build a GET request to the manage user endpoint
+        request = self.factory.get(MANAGE_USER_URL)
+        # Call the view directly with the request
+        response = ManageUserView.as_view()(request)
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the password too short error code is returned
+        # Test that the response is 401 UNAUTHORIZED
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Test that the not authenticated error code is returned
         self.assertEqual(
-            response.data['password'][0].code, 'password_too_common'
+            response.data['detail'].code, 'not_authenticated'
         )
 
-    def test_create_user_with_all_numeric_password_error(self):
-        """
-        Test that trying to create a user with an all
-        numeric password returns an error.
-        """
 
-        # Update the payload with a numeric password
-        self.payload['password'] = '284527272381290'
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+class PublicUserApiDbTests(TestCase):
+    """
+    Test suite for the user API (public access).
+    Requests that query the database, including the email
+    unique validator that runs on any non-empty email.
+    """
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the password entirely numeric error code is returned
-        self.assertEqual(
-            response.data['password'][0].code, 'password_entirely_numeric'
-        )
+    # Django creates a test client of this class for every test
+    client_class = APIClient
 
-    def test_create_user_with_an_empty_password_error(self):
+    @classmethod
+    def setUpTestData(cls):
         """
-        Test that trying to create a user with an empty
-        string password returns an error.
+        Set up data shared by the test suite. Created once per class
+        and rolled back to this state after each test.
         """
 
-        # Update the payload with an empty password
-        self.payload['password'] = ''
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the blank error code is returned
-        self.assertEqual(
-            response.data['password'][0].code, 'blank'
-        )
+        # Create an existing user once, rather than paying the
+        # password hash in every test that needs one. Logs in
+        # with the token payload in the token tests
+        cls.existing_user = create_user(**TOKEN_PAYLOAD)
 
-    def test_create_user_with_no_password_error(self):
-        """
-        Test that trying to create a user with no password
-        returns an error.
-        """
+    def test_create_user_success(self):
+        """Test creating a user is successful."""
 
-        # Remove the password from the payload
-        self.payload.pop('password')
         # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the required error code is returned
-        self.assertEqual(
-            response.data['password'][0].code, 'required'
+        response = self.client.post(
+            CREATE_USER_URL, BASE_PAYLOAD, format='json'
         )
 
-    def test_create_user_with_long_first_name_error(self):
-        """
-        Test that trying to create a user with a first name longer than
-        150 characters returns an error.
-        """
+        # Test that the response is 201 CREATED
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        # Update the payload with a long first name
-        self.payload['first_name'] = 'a' * 151
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        # Test that the key password is not returned in the response
+        self.assertNotIn('password', response.data)
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the max_length error code is returned
-        self.assertEqual(
-            response.data['first_name'][0].code, 'max_length'
+        # Test that the user was created successfully
+        # Get the user's password from the database with the email
+        # passed from payload, the only column the checks below need
+        user = get_user_model().objects.only('password').get(
+            email=BASE_PAYLOAD['email']
         )
 
-    def test_create_user_with_an_empty_first_name_error(self):
-        """
-        Test that trying to create a user with an empty
-        string first name returns an error.
-        """
-
-        # Update the payload with an empty first name
-        self.payload['first_name'] = ''
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Get the user's stored hashed password
+        # Let Django handle the password hashing
+        stored_password = user.password
 
-        # Test that the blank error code is returned
+        # Test that the stored password was hashed by the configured
+        # hasher. Reads the algorithm prefix of the hash instead of
+        # running the (slow) hasher again with check_password
         self.assertEqual(
-            response.data['first_name'][0].code, 'blank'
+            identify_hasher(stored_password).algorithm,
+            get_hasher().algorithm
         )
+        # Test that the stored password is not the same as the
+        # password passed in the payload
+        self.assertNotEqual(stored_password, BASE_PAYLOAD['password'])
 
-    def test_create_user_with_no_first_name_error(self):
+    def test_create_user_with_short_password_error(self):
         """
-        Test that trying to create a user with no first name
-        returns an error.
+        Test that trying to create a user with a password less than 8
+        characters returns an error and the user is not in the database.
         """
 
-        # Remove the first name from the payload
-        self.payload.pop('first_name')
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        # Payload with a password less than 8 characters
+        payload = {**BASE_PAYLOAD, 'password': 'short'}
+        # Make a POST request to the create user endpoint,
+        # recording the queries it runs
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                CREATE_USER_URL, payload, format='json'
+            )
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-
-        # Test that the required error code is returned
+        # Test that the password too short error code is returned
         self.assertEqual(
-            response.data['first_name'][0].code, 'required'
+            response.data['password'][0].code, 'password_too_short'
         )
 
-    def test_create_user_with_long_last_name_error(self):
-        """
-        Test that trying to create a user with a last name longer than
-        150 characters returns an error.
-        """
-
-        # Update the payload with a long last name
-        self.payload['last_name'] = 'a' * 151
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-
-        # Test that the max_length error code is returned
-        self.assertEqual(
-            response.data['last_name'][0].code, 'max_length'
-        )
+        # Test that the user was not created. Checks the queries the
+        # request ran for an INSERT rather than querying the database again
+        self.assertFalse(any(
+            query['sql'].startswith('INSERT') for query in queries
+        ))
 
-    def test_create_user_with_an_empty_last_name_error(self):
+    def test_serializer_validation_matrix(self):
         """
-        Test that trying to create a user with an empty
-        string last name returns an error.
+        Test that the user serializer rejects invalid and missing
+        field values with the expected error codes. Runs the serializer
+        directly, the HTTP endpoint is covered by the tests above.
         """
 
-        # Update the payload with an empty last name
-        self.payload['last_name'] = ''
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
-
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Loop through the invalid values
+        for field, value, code in CASES:
+            # Report each invalid value as its own failure
+            with self.subTest(field=field, code=code):
 
-        # Test that the blank error code is returned
-        self.assertEqual(
-            response.data['last_name'][0].code, 'blank'
-        )
+                # Copy the payload with the invalid value
+                payload = {**BASE_PAYLOAD, field: value}
+                # Validate the payload with the serializer
+                serializer = UserSerializer(data=payload)
 
-    def test_create_user_with_no_last_name_error(self):
-        """
-        Test that trying to create a user with no last name
-        returns an error.
-        """
+                # Test that the payload is invalid
+                self.assertFalse(serializer.is_valid())
+                # Test that the expected error code is returned
+                self.assertEqual(serializer.errors[field][0].code, code)
 
-        # Remove the last name from the payload
-        self.payload.pop('last_name')
-        # Make a POST request to the create user endpoint
-        response = self.client.post(CREATE_USER_URL, self.payload)
+        # Loop through the missing fields
+        for field, code in POP_CASES:
+            # Report each missing field as its own failure
+            with self.subTest(field=field, code=code):
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                # Copy the payload without the field
+                payload = payload_without(field)
+                # Validate the payload with the serializer
+                serializer = UserSerializer(data=payload)
 
-        # Test that the required error code is returned
-        self.assertEqual(
-            response.data['last_name'][0].code, 'required'
-        )
+                # Test that the payload is invalid
+                self.assertFalse(serializer.is_valid())
+                # Test that the expected error code is returned
+                self.assertEqual(serializer.errors[field][0].code, code)
 
     def test_create_token_success(self):
         """Test that a token is created for valid user credentials."""
 
-        # Create a user in the database with
-        # the details in the payload
-        create_user(**self.payload)
-
         # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        response = self.client.post(TOKEN_URL, TOKEN_PAYLOAD, format='json')
 
         # Test that the response is 200 OK
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -412,14 +383,10 @@ class PublicUserApiTests(TestCase):
         returns an error.
         """
 
-        # Create a user in the database with
-        # the details in the payload
-        create_user(**self.payload)
-
-        # Update the payload with invalid password
-        self.payload['password'] = 'wrong_password'
+        # Payload with an invalid password
+        payload = {**TOKEN_PAYLOAD, 'password': 'wrong_password'}
         # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        response = self.client.post(TOKEN_URL, payload, format='json')
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -430,137 +397,155 @@ class PublicUserApiTests(TestCase):
             response.data['non_field_errors'][0].code, 'authorization'
         )
 
-    def test_create_token_with_an_empty_password_error(self):
+    def test_create_token_returns_existing_token_in_one_query(self):
         """
-        Test that trying to create a token with an empty
-        string password returns an error.
+        Test that creating a token for a user with a token returns it,
+        getting the user and their token in one query.
         """
 
-        # Update the payload with an empty password
-        self.payload['password'] = ''
+        # Create a token for the existing user
+        token = Token.objects.create(user=self.existing_user)
+
         # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                TOKEN_URL, TOKEN_PAYLOAD, format='json'
+            )
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the token was not created
-        self.assertNotIn('token', response.data)
-        # Test that the blank error code is returned
-        self.assertEqual(
-            response.data['password'][0].code, 'blank'
-        )
+        # Test that the response is 200 OK
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the existing token is returned
+        self.assertEqual(response.data['token'], token.key)
 
-    def test_create_token_with_no_password_error(self):
+    def test_create_token_after_concurrent_first_login(self):
         """
-        Test that trying to create a token with no password
-        returns an error.
+        Test that a first login returns the token created by a
+        concurrent first login, rather than failing to create another.
         """
 
-        # Remove the password from the payload
-        self.payload.pop('password')
-        # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        # The serializer's validate method, which loads the user
+        # without a token
+        validate = TokenSerializer.validate
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the token was not created
-        self.assertNotIn('token', response.data)
-        # Test that the required error code is returned
+        def validate_then_login(serializer, attrs):
+            """Validate, then create the token as a concurrent login."""
+
+            attrs = validate(serializer, attrs)
+            # By user id, so the validated user does not see the token
+            Token.objects.create(user_id=attrs['user'].pk)
+            return attrs
+
+        # Make a POST request to the create token endpoint while
+        # another login creates the user's token
+        with patch.object(TokenSerializer, 'validate', validate_then_login):
+            response = self.client.post(
+                TOKEN_URL, TOKEN_PAYLOAD, format='json'
+            )
+
+        # Test that the response is 200 OK
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Test that the token created by the other login is returned
         self.assertEqual(
-            response.data['password'][0].code, 'required'
+            response.data['token'],
+            Token.objects.get(user=self.existing_user).key
         )
 
-    def test_create_token_with_invalid_email_error(self):
+    def test_create_token_with_invalid_password_sends_login_failed(self):
         """
-        Test that trying to create a token with invalid email
-        returns an error.
+        Test that a failed login sends the user_login_failed signal,
+        as authenticate() does, without the password.
         """
 
-        # Create a user in the database with
-        # the details in the payload
-        create_user(**self.payload)
+        # Record the signals sent
+        handler = Mock()
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
 
-        # Update the payload with invalid email
-        self.payload['email'] = 'notindatabase@example.com'
+        # Make a POST request with the wrong password
+        payload = {**TOKEN_PAYLOAD, 'password': 'wrong'}
+        self.client.post(TOKEN_URL, payload, format='json')
 
-        # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        # Test that the signal was sent once, without the password
+        handler.assert_called_once()
+        credentials = handler.call_args.kwargs['credentials']
+        self.assertEqual(credentials['username'], payload['email'])
+        self.assertNotEqual(credentials['password'], payload['password'])
 
-        # Test that the response is 400 BAD REQUEST
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        # Test that the token was not created
-        self.assertNotIn('token', response.data)
-        # Test that the authorization error code is returned
-        self.assertEqual(
-            response.data['non_field_errors'][0].code, 'authorization'
-        )
-
-    def test_create_token_with_an_empty_email_error(self):
+    def test_create_token_for_inactive_user_error(self):
         """
-        Test that trying to create a token with an empty
-        string email returns an error.
+        Test that trying to create a token for an inactive user
+        returns an error.
         """
 
-        # Update the payload with an empty email
-        self.payload['email'] = ''
+        # Deactivate the existing user
+        self.existing_user.is_active = False
+        self.existing_user.save()
+
         # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        response = self.client.post(TOKEN_URL, TOKEN_PAYLOAD, format='json')
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         # Test that the token was not created
         self.assertNotIn('token', response.data)
-        # Test that the blank error code is returned
-        self.assertEqual(
-            response.data['email'][0].code, 'blank'
-        )
 
-    def test_create_token_with_no_email_error(self):
+    def test_create_token_with_invalid_email_error(self):
         """
-        Test that trying to create a token with no email
+        Test that trying to create a token with invalid email
         returns an error.
         """
 
-        # Remove the email from the payload
-        self.payload.pop('email')
+        # Payload with an email that is not in the database,
+        # only the existing user is
+        payload = {**TOKEN_PAYLOAD, 'email': 'notindatabase@example.com'}
+
         # Make a POST request to the create token endpoint
-        response = self.client.post(TOKEN_URL, self.payload)
+        response = self.client.post(TOKEN_URL, payload, format='json')
 
         # Test that the response is 400 BAD REQUEST
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         # Test that the token was not created
         self.assertNotIn('token', response.data)
-        # Test that the required error code is returned
+        # Test that the authorization error code is returned
         self.assertEqual(
-            response.data['email'][0].code, 'required'
+            response.data['non_field_errors'][0].code, 'authorization'
         )
 
-    def test_authentication_required_for_user(self):
+    def test_create_token_with_unknown_email_hashes_password(self):
         """
-        Test that authentication is required for users.
+        Test that trying to create a token with an unknown email still
+        hashes the password, so it takes as long as a wrong password
+        and the response time does not reveal which emails exist.
         """
 
-        # Make a GET request to the user endpoint
-        response = self.client.get(MANAGE_USER_URL)
+        # Payload with an email that is not in the database
+        payload = {**TOKEN_PAYLOAD, 'email': 'notindatabase@example.com'}
 
-        # Test that the response is 401 UNAUTHORIZED
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        # Test that the not authenticated error code is returned
-        self.assertEqual(
-            response.data['detail'].code, 'not_authenticated'
-        )
+        # Make a POST request to the create token endpoint,
+        # recording the passwords hashed
+        with patch(
+            'django.contrib.auth.base_user.make_password',
+            wraps=make_password
+        ) as mock_make_password:
+            response = self.client.post(TOKEN_URL, payload, format='json')
+
+        # Test that the response is 400 BAD REQUEST
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Test that the password was hashed once
+        mock_make_password.assert_called_once_with(payload['password'])
 
 
 class PrivateUserApiTests(TestCase):
     """Test suite for the user API (private access)."""
 
+    # Django creates a test client of this class for every test
+    client_class = APIClient
+
     def setUp(self):
         """Set up the test suite."""
 
         # Create a user
         self.user = create_user()
-        # Create a test client to make test http requests
-        self.client = APIClient()
         # Authenticate the user with the client
         self.client.force_authenticate(user=self.user)
 
@@ -581,6 +566,46 @@ class PrivateUserApiTests(TestCase):
         # Test that the key password is not returned in the response
         self.assertNotIn('password', response.data)
 
+    def test_retrieve_user_profile_does_not_query_user(self):
+        """
+        Test retrieving the logged in user's profile returns the
+        authenticated user without querying the database.
+        """
+
+        # Test that the GET request makes no queries
+        with self.assertNumQueries(0):
+            response = self.client.get(MANAGE_USER_URL)
+
+        # Test that the response is 200 OK
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_user_profile_not_modified(self):
+        """
+        Test that retrieving the logged in user's profile with its
+        current ETag returns 304 NOT MODIFIED, and a new profile
+        once the user is updated.
+        """
+
+        # Retrieve the profile and its ETag
+        etag = self.client.get(MANAGE_USER_URL)['ETag']
+
+        # Retrieve the profile with the ETag
+        response = self.client.get(MANAGE_USER_URL, HTTP_IF_NONE_MATCH=etag)
+        # Test that the profile was not modified
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Update the user's name
+        self.client.patch(
+            MANAGE_USER_URL, {'first_name': 'NewName'}, format='json'
+        )
+        # Retrieve the profile with the old ETag
+        response = self.client.get(MANAGE_USER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        # Test that the updated profile is returned with a new ETag
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'NewName')
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_manage_user_post_method_not_allowed(self):
         """Test that POST is not allowed on the manage user url."""
 
@@ -606,7 +631,11 @@ class PrivateUserApiTests(TestCase):
             'password': '2_elephants_in_a_boat'
         }
         # Make a PATCH request to the manage user endpoint
-        response = self.client.patch(MANAGE_USER_URL, payload)
+        # capturing the queries
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                MANAGE_USER_URL, payload, format='json'
+            )
 
         # Refresh the user object with the latest values from the database
         self.user.refresh_from_db()
@@ -617,5 +646,12 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.first_name, payload['first_name'])
         # Test that the user's password was updated successfully
         self.assertTrue(self.user.check_password(payload['password']))
+        # Test that the name and password were saved in one update
+        updates = [query['sql'] for query in queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        # Test that only the fields passed in were written
+        self.assertNotIn('"email"', updates[0])
+        self.assertNotIn('"last_name"', updates[0])
         # Test that the key password is not returned in the response
         self.assertNotIn('password', response.data)
@@ -1,8 +1,11 @@
 """
 Serializers for the topic API.
 """
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
+from app.serializers import CachedFieldsModelSerializer
 from core.models import (
     Topic,
     Tag,
@@ -11,6 +14,21 @@ from core.models import (
 )
 
 
+def _attr_key(values, fields):
+    """
+    Return a hashable key of the values of the given fields.
+    Lists (question wrong answers) become tuples so they can be keys.
+    """
+
+    key = []
+    for field in fields:
+        value = values[field]
+        if isinstance(value, list):
+            value = tuple(value)
+        key.append((field, value))
+    return tuple(key)
+
+
 class TagSerializer(serializers.ModelSerializer):
     """
     Tag object.
@@ -22,9 +40,9 @@ class TagSerializer(serializers.ModelSerializer):
         # Associate the serializer with the tag model
         model = Tag
         # Fields to include in the tag API
-        fields = ['id', 'name']
+        fields = ('id', 'name')
         # Make the id field read only
-        read_only_fields = ['id']
+        read_only_fields = ('id',)
 
 
 class ResourceSerializer(serializers.ModelSerializer):
@@ -38,9 +56,9 @@ class ResourceSerializer(serializers.ModelSerializer):
         # Associate the serializer with the resource model
         model = Resource
         # Fields to include in the resource API
-        fields = ['id', 'name', 'link']
+        fields = ('id', 'name', 'link')
         # Make the id field read only
-        read_only_fields = ['id']
+        read_only_fields = ('id',)
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -54,15 +72,17 @@ class QuestionSerializer(serializers.ModelSerializer):
         # Associate the serializer with the question model
         model = Question
         # Fields to include in the question API
-        fields = ['id', 'name', 'answer', 'wrong_answers']
+        fields = ('id', 'name', 'answer', 'wrong_answers')
         # Make the id field read only
-        read_only_fields = ['id']
+        read_only_fields = ('id',)
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(CachedFieldsModelSerializer):
     """
     Topic object.
     """
+    # Extends CachedFieldsModelSerializer, the fields
+    # are built once rather than for every topic serialized.
 
     # List of tags (many=True) they have a nested
     # relationship to topic they are optional
@@ -82,80 +102,67 @@ class TopicSerializer(serializers.ModelSerializer):
         # Associate the serializer with the topic model
         model = Topic
         # Fields to include in the topic API
-        fields = ['id',
+        # Tuples are immutable, so subclasses can safely extend them
+        fields = ('id',
                   'title',
                   'last_modified',
                   'tags',
                   'resources',
-                  'questions']
+                  'questions')
         # Make the id and last_modified fields read only
-        read_only_fields = ['id', 'last_modified']
+        read_only_fields = ('id', 'last_modified')
 
-    def _get_or_create_tags(self, tags, topic):
-        """
-        Get or create the tags if they do not exist.
+    def _get_or_create_attrs(self, model, items, auth_user):
         """
-
-        # Get the authenticated user
-        auth_user = self.context['request'].user
-
-        # Iterate over the tags
-        for tag in tags:
-            # Get or create the tag if it does not exist
-            # I.e., if the tag exists with the name and user passed in
-            # arguments, get it, else create it avoiding duplicate tags.
-            # **tag param allows for adding additional tag fields in the future
-            tag_object, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag
-            )
-            # Add the tag to the topic
-            topic.tags.add(tag_object)
-
-    def _get_or_create_resources(self, resources, topic):
+        Get or create the topic attributes (tags, resources or questions)
+        for the authenticated user if they do not exist. Uses a fixed number
+        of queries however many items are passed in.
+        Returns the attribute objects.
         """
-        Get or create the resources if they do not exist.
-        """
-
-        # Get the authenticated user
-        auth_user = self.context['request'].user
-
-        # Iterate over the resources
-        for resource in resources:
-            # Get or create the resource if it does not exist
-            # I.e., if the resource exists with the name and user passed in
-            # arguments, get it, else create it avoiding duplicate resources.
-            # **resource param allows for adding additional resource fields
-            # in the future
-            resource_object, created = Resource.objects.get_or_create(
-                user=auth_user,
-                **resource
-            )
-            # Add the resource to the topic
-            topic.resources.add(resource_object)
-
-    def _get_or_create_questions(self, questions, topic):
-        """
-        Get or create the questions if they do not exist.
-        """
-
-        # Get the authenticated user
-        auth_user = self.context['request'].user
 
-        # Iterate over the questions
-        for question in questions:
-            # Get or create the question if it does not exist
-            # I.e., if the question exists with the name and user passed in
-            # arguments, get it, else create it avoiding duplicate questions.
-            # **question param allows for adding additional question fields
-            # in the future
-            question_object, created = Question.objects.get_or_create(
-                user=auth_user,
-                **question
+        # Key the items by their field values, without duplicates
+        # I.e., items passed in more than once are only created once
+        items_by_key = {_attr_key(item, item): item for item in items}
+
+        # Get the user's existing objects that could match the items
+        # in one query. Every attribute has a name so narrow by name,
+        # then match the rest of the fields below
+        candidates = list(model.objects.filter(
+            user=auth_user,
+            name__in={item['name'] for item in items_by_key.values()}
+        ))
+
+        # Existing objects to reuse and new objects to create
+        attr_objects = []
+        new_objects = []
+
+        # Iterate over the items
+        for key, item in items_by_key.items():
+            # Get the existing object with the field values passed in
+            # I.e., if the object exists with the fields and user passed in
+            # reuse it, else create it avoiding duplicate objects.
+            # Only the fields passed in are matched, as get_or_create does
+            match = next(
+                (obj for obj in candidates
+                 if _attr_key(vars(obj), item) == key),
+                None
             )
-            # Add the question to the topic
-            topic.questions.add(question_object)
-
+            if match is None:
+                # **item allows for adding additional fields in the future
+                new_objects.append(model(user=auth_user, **item))
+            else:
+                attr_objects.append(match)
+
+        # Create the objects that do not exist in one query
+        # PostgreSQL returns the new ids so they can be added to the topic
+        attr_objects += model.objects.bulk_create(new_objects)
+
+        # Return the existing and new objects
+        return attr_objects
+
+    # Create the topic and its attributes in one transaction, so a
+    # failure leaves nothing half created and there is a single commit
+    @transaction.atomic
     def create(self, validated_data):
         """
         Override the create method to allow create for nested serializers.
@@ -178,19 +185,29 @@ class TopicSerializer(serializers.ModelSerializer):
         # Create the topic without the additional attributes
         topic = Topic.objects.create(**validated_data)
 
-        # Call the _get_or_create_tags method to get
-        # existing tags or create the tags
-        self._get_or_create_tags(tags, topic)
-        # Call the _get_or_create_resources method to get
-        # existing resources or create the resources
-        self._get_or_create_resources(resources, topic)
-        # Call the _get_or_create_questions method to get
-        # existing questions or create the questions
-        self._get_or_create_questions(questions, topic)
+        # Get the authenticated user once for all the attributes
+        auth_user = self.context['request'].user
+
+        # Get existing tags or create the tags
+        # and add them to the topic in one query
+        topic.tags.add(*self._get_or_create_attrs(Tag, tags, auth_user))
+        # Get existing resources or create the resources
+        # and add them to the topic in one query
+        topic.resources.add(
+            *self._get_or_create_attrs(Resource, resources, auth_user)
+        )
+        # Get existing questions or create the questions
+        # and add them to the topic in one query
+        topic.questions.add(
+            *self._get_or_create_attrs(Question, questions, auth_user)
+        )
 
         # Return the topic
         return topic
 
+    # Update the topic and its attributes in one transaction, so a
+    # failure leaves nothing half updated and there is a single commit
+    @transaction.atomic
     def update(self, instance, validated_data):
         """
         Override the update method to allow update for nested serializers.
@@ -209,35 +226,38 @@ class TopicSerializer(serializers.ModelSerializer):
         # If no questions are passed in, set the questions variable to None
         questions = validated_data.pop('questions', None)
 
+        # Get the authenticated user once for all the attributes
+        auth_user = self.context['request'].user
+
         # If tags were passed in
         if tags is not None:
 
-            # Clear the existing tags
-            instance.tags.clear()
-
-            # Call the _get_or_create_tags method to get
-            # existing tags or create the tags
-            self._get_or_create_tags(tags, instance)
+            # Get existing tags or create the tags and set them
+            # as the topic's tags. Only the tags added or removed
+            # are written, an empty list clears the tags
+            instance.tags.set(
+                self._get_or_create_attrs(Tag, tags, auth_user)
+            )
 
         # If resources were passed in
         if resources is not None:
 
-            # Clear the existing resources
-            instance.resources.clear()
-
-            # Call the _get_or_create_resources method to get
-            # existing resources or create the resources
-            self._get_or_create_resources(resources, instance)
+            # Get existing resources or create the resources and set them
+            # as the topic's resources. Only the resources added or removed
+            # are written, an empty list clears the resources
+            instance.resources.set(
+                self._get_or_create_attrs(Resource, resources, auth_user)
+            )
 
         # If questions were passed in
         if questions is not None:
 
-            # Clear the existing questions
-            instance.questions.clear()
-
-            # Call the _get_or_create_questions method to get
-            # existing questions or create the questions
-            self._get_or_create_questions(questions, instance)
+            # Get existing questions or create the questions and set them
+            # as the topic's questions. Only the questions added or removed
+            # are written, an empty list clears the questions
+            instance.questions.set(
+                self._get_or_create_attrs(Question, questions, auth_user)
+            )
 
         # Update the topic fields
         for attr, value in validated_data.items():
@@ -262,4 +282,56 @@ class TopicDetailSerializer(TopicSerializer):
         """
 
         # Add additional fields to the topic detail method
-        fields = TopicSerializer.Meta.fields + ['notes']
+        fields = TopicSerializer.Meta.fields + ('notes',)
+
+    def to_representation(self, instance):
+        """
+        Prefetch the topic's attributes before serializing it.
+        Does nothing for attributes already prefetched, e.g. by the
+        viewset's queryset, so only callers that did not prefetch query.
+        """
+
+        # Prefetch the tags, resources and questions not already prefetched
+        prefetch_related_objects([instance], 'tags', 'resources', 'questions')
+
+        # Serialize the topic
+        return super().to_representation(instance)
+
+
+class TopicListSerializer(serializers.BaseSerializer):
+    """
+    Read only topic object for the topic list.
+    Returns the same data as TopicSerializer, built directly from the
+    topic and its prefetched attributes rather than field by field.
+    """
+
+    # Formats the last modified datetime as TopicSerializer does
+    last_modified_field = serializers.DateTimeField()
+
+    def to_representation(self, instance):
+        """Return the topic and its attributes as a dictionary."""
+
+        # The topic fields, and the fields of the tags,
+        # resources and questions, in the topic serializer's order
+        return {
+            'id': instance.id,
+            'title': instance.title,
+            'last_modified': self.last_modified_field.to_representation(
+                instance.last_modified
+            ),
+            'tags': [
+                {'id': tag.id, 'name': tag.name}
+                for tag in instance.tags.all()
+            ],
+            'resources': [
+                {'id': resource.id, 'name': resource.name,
+                 'link': resource.link}
+                for resource in instance.resources.all()
+            ],
+            'questions': [
+                {'id': question.id, 'name': question.name,
+                 'answer': question.answer,
+                 'wrong_answers': question.wrong_answers}
+                for question in instance.questions.all()
+            ],
+        }
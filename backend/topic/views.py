@@ -1,6 +1,10 @@
 """
 Topic API views.
 """
+import hashlib
+import re
+import uuid
+
 from drf_spectacular.utils import (
     extend_schema_view,
     extend_schema,
@@ -8,15 +12,59 @@ from drf_spectacular.utils import (
     OpenApiTypes
 )
 
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone
+
 from rest_framework import (
     viewsets,
     mixins
 )
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from app.mixins import ConditionalRetrieveMixin
+from app.pagination import TopicPagination
 from core.models import Topic, Tag, Resource, Question
 from topic import serializers
+from user.authentication import CachedTokenAuthentication
+
+
+# Ids in the filter query strings, ASCII digits only
+_INT_RE = re.compile(r'[0-9]+')
+# Longest filter query string parsed, longer strings are cut short
+_MAX_PARAM_LENGTH = 4096
+# Seconds a user's topic list pages are cached for. Changes made
+# outside the topic API (e.g. the admin) show after at most this long
+_TOPICS_CACHE_TIMEOUT = 300
+
+
+def _topics_cache_version_key(user_id):
+    """Return the cache key of the version of a user's topic lists."""
+
+    return f'topics:v:{user_id}'
+
+
+def _topics_cache_version(user_id):
+    """
+    Return the version of the user's cached topic lists,
+    starting a new version if there is none.
+    """
+
+    return cache.get_or_set(
+        _topics_cache_version_key(user_id),
+        uuid.uuid4().hex,
+        _TOPICS_CACHE_TIMEOUT
+    )
+
+
+def _invalidate_topics_cache(user_id):
+    """
+    Remove the version of the user's cached topic lists, so the
+    next list starts a new version and none of the old pages are used.
+    """
+
+    cache.delete(_topics_cache_version_key(user_id))
 
 
 # Extend the schema for the TopicViewSet
@@ -24,6 +72,8 @@ from topic import serializers
 # adds additional OpenAPI documentation to the viewset
 @extend_schema_view(
     list=extend_schema(
+        # The list returns the topics as TopicSerializer does
+        responses=serializers.TopicSerializer,
         parameters=[
             OpenApiParameter(
                 'tags',
@@ -43,30 +93,43 @@ from topic import serializers
         ]
     )
 )
-class TopicViewSet(viewsets.ModelViewSet):
+class TopicViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """
     Manage topics.
     """
-    # Extends DRF's ModelViewSet.
+    # Extends ConditionalRetrieveMixin and DRF's ModelViewSet.
 
     # Set DRF's serializer class to the custom topic detail serializer
     serializer_class = serializers.TopicDetailSerializer
-    # Set the queryset to all the topic objects
-    queryset = Topic.objects.all()
+    # Empty queryset for DRF's router and schema introspection
+    # get_queryset returns the authenticated user's topics
+    queryset = Topic.objects.none()
     # Set the authentication for the viewset to token authentication
-    authentication_classes = [TokenAuthentication]
+    # The authenticated user is cached, so it is not queried every request
+    authentication_classes = [CachedTokenAuthentication]
     # Must be authenticated to use the viewset
     permission_classes = [IsAuthenticated]
+    # Paginate the topics list, a page of topics at most is loaded
+    pagination_class = TopicPagination
+    # Topic detail ETags change when the topic's last_modified does
+    etag_field = 'last_modified'
 
     def _params_to_ints(self, query_string):
         """
         Convert a list of string IDs to a list of integers.
         """
 
-        # Split the query string by commas
-        string_ids = query_string.split(',')
-        # Return the list of string IDs converted to integers
-        return [int(str_id) for str_id in string_ids]
+        # Cap the query string to bound the parsing per request
+        capped = query_string[:_MAX_PARAM_LENGTH]
+        # If the cap cut an ID in two, drop its first half rather
+        # than filter by a different ID (e.g. 12 of 12345)
+        if query_string[_MAX_PARAM_LENGTH:_MAX_PARAM_LENGTH + 1].isdigit():
+            capped = capped.rstrip('0123456789')
+
+        # Find the IDs in the query string with the compiled regex and
+        # return them converted to integers. Anything other than digits
+        # separates the IDs, so invalid input is ignored, not an error
+        return list(map(int, _INT_RE.findall(capped)))
 
     def get_queryset(self):
         """
@@ -80,35 +143,76 @@ class TopicViewSet(viewsets.ModelViewSet):
         # Get the questions query string
         questions = self.request.query_params.get('questions')
 
-        # Get the queryset
-        queryset = self.queryset
+        # Get the queryset of the authenticated user's topics
+        # ordered by most recently created
+        queryset = Topic.objects.for_user(self.request.user)
 
         # If the tags query string is provided
         if tags:
             # Convert the tags query string to a list of integers
             tag_ids = self._params_to_ints(tags)
-            # Filter the queryset by the tag IDs
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            # Filter the queryset by the tag IDs. EXISTS on the through
+            # table rather than a join, so each topic is returned once
+            queryset = queryset.filter(Exists(
+                Topic.tags.through.objects.filter(
+                    topic_id=OuterRef('pk'),
+                    tag_id__in=tag_ids
+                )
+            ))
 
         # If the resources query string is provided
         if resources:
             # Convert the resources query string to a list of integers
             resource_ids = self._params_to_ints(resources)
-            # Filter the queryset by the resource IDs
-            queryset = queryset.filter(resources__id__in=resource_ids)
+            # Filter the queryset by the resource IDs. EXISTS on the through
+            # table rather than a join, so each topic is returned once
+            queryset = queryset.filter(Exists(
+                Topic.resources.through.objects.filter(
+                    topic_id=OuterRef('pk'),
+                    resource_id__in=resource_ids
+                )
+            ))
 
         # If the questions query string is provided
         if questions:
             # Convert the questions query string to a list of integers
             question_ids = self._params_to_ints(questions)
-            # Filter the queryset by the question IDs
-            queryset = queryset.filter(questions__id__in=question_ids)
+            # Filter the queryset by the question IDs. EXISTS on the through
+            # table rather than a join, so each topic is returned once
+            queryset = queryset.filter(Exists(
+                Topic.questions.through.objects.filter(
+                    topic_id=OuterRef('pk'),
+                    question_id__in=question_ids
+                )
+            ))
+
+        # If listing the topics
+        if self.action == 'list':
+            # Only the fields the topic list serializer uses, the
+            # notes can be long and are only in the topic detail
+            queryset = queryset.only('id', 'title', 'last_modified')
+            # Prefetch the nested attributes the list returns, one query
+            # per attribute for all the topics instead of one per topic.
+            # Only the fields the attribute serializers use are loaded
+            queryset = queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+                Prefetch(
+                    'resources',
+                    queryset=Resource.objects.only('id', 'name', 'link')
+                ),
+                Prefetch(
+                    'questions',
+                    queryset=Question.objects.only(
+                        'id', 'name', 'answer', 'wrong_answers'
+                    )
+                )
+            )
 
-        # Return the topics (with any filtering applied) for the authenticated
-        # user, ordered by most recently created, distinct topics only
-        return queryset.filter(
-                user=self.request.user
-            ).order_by('-id').distinct()
+        # Return the topics (with any filtering applied).
+        # A single topic's attributes are prefetched by the topic detail
+        # serializer, only if it is serialized. I.e., not for a 304 NOT
+        # MODIFIED retrieve, or a delete
+        return queryset
 
     def get_serializer_class(self):
         """
@@ -116,13 +220,50 @@ class TopicViewSet(viewsets.ModelViewSet):
         https://www.django-rest-framework.org/api-guide/generic-views/#get_serializer_classself
         """
 
-        # Return the list serializer if the action is list
+        # If the action is list
         if self.action == 'list':
+            # Return the read only list serializer to list the topics
+            # The browsable API's create form still needs a serializer
+            # with fields, it renders the form as a POST request
+            if self.request.method == 'GET':
+                return serializers.TopicListSerializer
+            # Return the list serializer
             return serializers.TopicSerializer
 
         # Return the default serializer (TopicDetailSerializer)
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """
+        List the topics, from the cache if the user's topics
+        have not changed since the page was cached.
+        """
+
+        # Cache key of the page for the user's current topics version
+        # The full URL includes the page, page size, filters and host
+        url_hash = hashlib.md5(
+            request.build_absolute_uri().encode()
+        ).hexdigest()
+        cache_key = (
+            f'topics:{request.user.pk}:'
+            f'{_topics_cache_version(request.user.pk)}:{url_hash}'
+        )
+
+        # Get the cached page data
+        data = cache.get(cache_key)
+
+        # If the page is not cached
+        if data is None:
+            # List the topics
+            response = super().list(request, *args, **kwargs)
+            # Cache the page data for the next requests
+            cache.set(cache_key, response.data, _TOPICS_CACHE_TIMEOUT)
+            # Return the response
+            return response
+
+        # Return the cached page data, rendered for this request
+        return Response(data)
+
     def perform_create(self, serializer):
         """
         Create a new topic.
@@ -131,6 +272,24 @@ class TopicViewSet(viewsets.ModelViewSet):
 
         # Set the user to the authenticated user
         serializer.save(user=self.request.user)
+        # The user's cached topic lists are out of date
+        _invalidate_topics_cache(self.request.user.pk)
+
+    def perform_update(self, serializer):
+        """Update a topic."""
+
+        # Save the topic
+        serializer.save()
+        # The user's cached topic lists are out of date
+        _invalidate_topics_cache(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        """Delete a topic."""
+
+        # Delete the topic
+        instance.delete()
+        # The user's cached topic lists are out of date
+        _invalidate_topics_cache(self.request.user.pk)
 
 
 # Extend the schema for the BaseTopicAttrViewSet
@@ -159,9 +318,12 @@ class BaseTopicAttrViewSet(
     # Extends DRF's GenericViewSet and mixins.
 
     # Set the authentication for the viewsets to token authentication
-    authentication_classes = [TokenAuthentication]
+    # The authenticated user is cached, so it is not queried every request
+    authentication_classes = [CachedTokenAuthentication]
     # Must be authenticated to use the viewsets
     permission_classes = [IsAuthenticated]
+    # Topic field relating topics to the objects, set by each viewset
+    topic_field = None
 
     def get_queryset(self):
         """Return objects for the current authenticated user only"""
@@ -179,14 +341,48 @@ class BaseTopicAttrViewSet(
 
         # If assigned_only is True
         if assigned_only:
+            # Topic many to many through table for the objects
+            through = getattr(Topic, self.topic_field).through
             # Filter the queryset by objects that are assigned to topics
-            queryset = queryset.filter(topic__isnull=False)
+            # EXISTS on the through table rather than a join, so each
+            # object is returned once without DISTINCT
+            queryset = queryset.filter(Exists(through.objects.filter(**{
+                queryset.model._meta.model_name: OuterRef('pk')
+            })))
 
         # Return the queryset filtered by the authenticated user
-        # Distinct objects only
         return queryset.filter(
             user=self.request.user
-        ).distinct()
+        )
+
+    def _touch_topics(self, instance):
+        """
+        Update the last modified time of the topics with the object,
+        as their details include it. Changes the topics' ETags and
+        removes the user's cached topic lists.
+        """
+
+        # Update the topics with the object in one query
+        Topic.objects.filter(**{self.topic_field: instance}).update(
+            last_modified=timezone.now()
+        )
+        # The user's cached topic lists, which include the object,
+        # are out of date
+        _invalidate_topics_cache(self.request.user.pk)
+
+    def perform_update(self, serializer):
+        """Update the object and the topics with it."""
+
+        # Save the object then update the topics with it
+        self._touch_topics(serializer.save())
+
+    def perform_destroy(self, instance):
+        """Delete the object and update the topics it was removed from."""
+
+        # Update the topics while they still have the object
+        self._touch_topics(instance)
+        # Delete the object
+        instance.delete()
 
 
 class TagViewSet(BaseTopicAttrViewSet):
@@ -198,7 +394,12 @@ class TagViewSet(BaseTopicAttrViewSet):
     # Set DRF's serializer class to the custom tag serializer
     serializer_class = serializers.TagSerializer
     # Set the queryset to all the tag objects
-    queryset = Tag.objects.all().order_by('name')
+    # Only the fields the tag serializer uses
+    queryset = Tag.objects.only(
+        'id', 'name'
+    ).order_by('name')
+    # Topic field relating topics to tags
+    topic_field = 'tags'
 
 
 class ResourceViewSet(BaseTopicAttrViewSet):
@@ -210,7 +411,12 @@ class ResourceViewSet(BaseTopicAttrViewSet):
     # Set DRF's serializer class to the custom resource serializer
     serializer_class = serializers.ResourceSerializer
     # Set the queryset to all the resource objects
-    queryset = Resource.objects.all().order_by('name')
+    # Only the fields the resource serializer uses
+    queryset = Resource.objects.only(
+        'id', 'name', 'link'
+    ).order_by('name')
+    # Topic field relating topics to resources
+    topic_field = 'resources'
 
 
 class QuestionViewSet(BaseTopicAttrViewSet):
@@ -222,4 +428,9 @@ class QuestionViewSet(BaseTopicAttrViewSet):
     # Set DRF's serializer class to the custom question serializer
     serializer_class = serializers.QuestionSerializer
     # Set the queryset to all the question objects
-    queryset = Question.objects.all().order_by('id')
+    # Only the fields the question serializer uses
+    queryset = Question.objects.only(
+        'id', 'name', 'answer', 'wrong_answers'
+    ).order_by('id')
+    # Topic field relating topics to questions
+    topic_field = 'questions'
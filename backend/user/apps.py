@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        """Connect the user app's signal receivers."""
+
+        # Importing the module connects its receivers, which remove
+        # cached token authentication when a user or token changes
+        import user.authentication  # noqa: F401
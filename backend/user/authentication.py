@@ -0,0 +1,127 @@
+"""
+Authentication for the REST APIs.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Model fields of the user saved in the cache, without the
+# password, which is only read from the database if needed
+CACHED_USER_FIELDS = [
+    field.attname
+    for field in get_user_model()._meta.concrete_fields
+    if field.attname != 'password'
+]
+
+
+def token_cache_key(key):
+    """Return the cache key of the user id authenticated by a token key."""
+
+    return f'drf_token:{key}'
+
+
+def user_cache_key(user_id):
+    """Return the cache key of the field values of a token's user."""
+
+    return f'drf_token_user:{user_id}'
+
+
+# Connected when the user app is ready, so every save of a user,
+# through the API, the admin or the ORM, removes their cached fields.
+# The key is derived from the user, so this makes no query
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, **kwargs):
+    """
+    Remove the saved user's cached field values, so their next
+    token request sees the changes (e.g. is_active=False).
+    """
+
+    cache.delete(user_cache_key(instance.pk))
+
+
+# Deleting a user deletes their tokens, so this also removes
+# the cached tokens of deleted users
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+def token_changed(sender, instance, **kwargs):
+    """
+    Remove the changed or deleted token's cached authentication,
+    so a revoked token is not authenticated from the cache.
+    """
+
+    cache.delete(token_cache_key(instance.key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches the authenticated user,
+    so a request with a cached token does not query the database.
+    Extends DRF's TokenAuthentication.
+    """
+
+    # Seconds a token's user is cached for, changes made outside the
+    # user API (e.g. the admin) are picked up after at most this long
+    cache_timeout = 300
+
+    def authenticate_credentials(self, key):
+        """
+        Return the user and token for the token key,
+        from the cache or else from the database.
+        """
+
+        # Get the id of the token's user, then the user's cached field
+        # values. The values are cached per user, so saving the user
+        # removes them without looking up the user's tokens
+        user_id = cache.get(token_cache_key(key))
+        values = None if user_id is None else cache.get(
+            user_cache_key(user_id)
+        )
+
+        # If the token's user was not cached, or was cached
+        # before the user model fields changed
+        if values is None or list(values) != CACHED_USER_FIELDS:
+            # Get the token and its user from the database in one query
+            try:
+                token = Token.objects.select_related('user').get(key=key)
+            # If the token does not exist
+            except Token.DoesNotExist:
+                # Raise an authentication error as TokenAuthentication does
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            # Get the token's user
+            user = token.user
+            # Cache the token's user id and the user's field values
+            # for the next requests
+            cache.set_many({
+                token_cache_key(key): user.pk,
+                user_cache_key(user.pk): {
+                    name: getattr(user, name) for name in CACHED_USER_FIELDS
+                },
+            }, self.cache_timeout)
+        # If the token's user was cached
+        else:
+            # Rebuild the user from the cached field values,
+            # as if it had been loaded from the database
+            user = get_user_model().from_db(
+                DEFAULT_DB_ALIAS, CACHED_USER_FIELDS, list(values.values())
+            )
+            # The token, without querying it
+            token = Token(key=key, user=user)
+
+        # If the user has been deactivated
+        if not user.is_active:
+            # Raise an authentication error as TokenAuthentication does
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        # Return the user and their token
+        return (user, token)
@@ -3,25 +3,37 @@ Serializers for the user API.
 """
 from django.contrib.auth import (
     get_user_model,
-    password_validation,
-    authenticate
+    password_validation
 )
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.signals import user_login_failed
 from django.utils.translation import gettext as _
+from django.views.decorators.debug import sensitive_variables
 
 from rest_framework import serializers
 
+from app.serializers import (
+    CachedFieldsSerializer,
+    CachedFieldsModelSerializer
+)
+
+# The custom user model, also used by the user views
+User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(CachedFieldsModelSerializer):
     """
     User object. first_name, last_name,
     email, and password fields.
     """
+    # Extends CachedFieldsModelSerializer, the fields
+    # are built once rather than for every request.
 
     class Meta:
         """Meta class allows for validation rules for the data"""
 
         # Associate the serializer with the user model
-        model = get_user_model()
+        model = User
         # Fields to include in the user API
         fields = ['first_name', 'last_name', 'email', 'password']
         # Extra keyword arguments passes extra metadata
@@ -45,7 +57,7 @@ class UserSerializer(serializers.ModelSerializer):
         """Create a new valid user and return it"""
 
         # Create a user if the validation of the data was a success
-        return get_user_model().objects.create_user(**validated_data)
+        return User.objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
         """Update a user with encrypted password correctly and return it"""
@@ -53,26 +65,37 @@ class UserSerializer(serializers.ModelSerializer):
         # Get the password from the validated data
         # If the password is not provided, return None
         password = validated_data.pop('password', None)
-        # Update the user with the validated data
-        # with existing update method from ModelSerializer
-        user = super().update(instance, validated_data)
+
+        # Update the user fields
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # Fields to save, only the fields passed in are written
+        update_fields = list(validated_data)
 
         # If a password was provided
         if password:
             # Set the password (encrypts it)
-            user.set_password(password)
-            # Save the user to the database
-            user.save()
+            instance.set_password(password)
+            # Save the password with the other fields in one query
+            update_fields.append('password')
+
+        # If any fields were passed in
+        if update_fields:
+            # Save only the updated fields to the database, and the
+            # updated_at time, which changes the user's ETag
+            instance.save(update_fields=[*update_fields, 'updated_at'])
 
         # Return the user
-        return user
+        return instance
 
 
-class TokenSerializer(serializers.Serializer):
+class TokenSerializer(CachedFieldsSerializer):
     """
     Token object for user authentication. Requires valid
     email and password credentials to generate the token.
     """
+    # Extends CachedFieldsSerializer, the fields
+    # are built once rather than for every login.
 
     # Fields for authentication with the token API
     email = serializers.EmailField()
@@ -84,21 +107,51 @@ class TokenSerializer(serializers.Serializer):
     )
 
     # Validate the email and password when the serializer is called by view
+    # Keep the password out of error reports, as authenticate() does
+    @sensitive_variables('attrs', 'password')
     def validate(self, attrs):
-        """Validate and authenticate the user that is logging in"""
+        """
+        Validate and authenticate the user that is logging in.
+        Checks the credentials as Django's ModelBackend does, rather
+        than calling authenticate(), so the user and their token are
+        loaded in one query. Only the ModelBackend is used, whatever
+        AUTHENTICATION_BACKENDS lists, so a backend added there must
+        be added here too.
+        """
 
         # Get the email and password from the request
         email = attrs.get('email')
         password = attrs.get('password')
-        # Authenticate the user with the provided credentials
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,  # Use email instead of username
-            password=password
-        )
+        # Get the user with the email and their token in one query
+        # The token view returns the token without querying it again
+        user = User.objects.select_related(
+            'auth_token'
+        ).filter(email=email).first()
+
+        # If there is no user with the email
+        if user is None:
+            # Hash the password anyway, as Django's ModelBackend does,
+            # so the response time does not reveal which emails exist
+            User().set_password(password)
+        # If the password is wrong or the ModelBackend would reject
+        # the user (i.e. inactive). check_password rehashes a password
+        # with outdated settings
+        elif not (
+            user.check_password(password)
+            and ModelBackend().user_can_authenticate(user)
+        ):
+            # The user can't authenticate
+            user = None
 
         # If the authentication failed
         if not user:
+            # Send the failed login signal, as authenticate() does,
+            # without the password
+            user_login_failed.send(
+                sender=__name__,
+                credentials={'username': email, 'password': '*' * 20},
+                request=self.context.get('request')
+            )
             # Set the error message
             msg = _('Unable to authenticate with provided credentials.')
             # Raise a validation error
@@ -1,11 +1,16 @@
 """
 User API views.
 """
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from app.mixins import ConditionalRetrieveMixin
+from user.authentication import CachedTokenAuthentication
 from user.serializers import (
+    User,
     UserSerializer,
     TokenSerializer
 )
@@ -33,25 +38,66 @@ class CreateTokenView(ObtainAuthToken):
     # Enable the browsable UI for the token API endpoint
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        """
+        Return the token of the user with the credentials passed in,
+        creating it on their first login.
+        """
+
+        # Validate and authenticate the credentials
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Get the authenticated user, loaded with their token
+        user = serializer.validated_data['user']
+
+        # Get the user's token, if they have one
+        try:
+            token = user.auth_token
+        # If the user has no token yet
+        except Token.DoesNotExist:
+            # Create the user's token. get_or_create gets the token
+            # instead if a concurrent first login has just created it
+            token, _ = Token.objects.get_or_create(user=user)
+
+        # Return the token key
+        return Response({'token': token.key})
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+
+class ManageUserView(
+        ConditionalRetrieveMixin, generics.RetrieveUpdateAPIView):
     """
     Endpoint to manage the authenticated user [GET, PUT, PATCH].
     """
-    # Extends DRF's RetrieveUpdateAPIView.
+    # Extends ConditionalRetrieveMixin and DRF's RetrieveUpdateAPIView.
 
     # Set DRF's serializer class to the custom user serializer
     serializer_class = UserSerializer
 
-    # Set the authentication and permission classes
-    # to the default DRF classes
-    authentication_classes = [authentication.TokenAuthentication]
+    # Set the authentication and permission classes. Token
+    # authentication with the authenticated user cached, so it
+    # is not queried every request
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    # User ETags change when the user's updated_at does
+    etag_field = 'updated_at'
+
+    def get_queryset(self):
+        """
+        Return the users with only the fields the user serializer uses.
+        get_object returns the authenticated user without querying,
+        so this only narrows any other use of the view's queryset.
+        """
+
+        # Only the id and the fields of the user API
+        return User.objects.only(
+            'id', 'first_name', 'last_name', 'email', 'updated_at'
+        )
 
     def get_object(self):
         """
         Retrieve and return the authenticated user
         """
 
-        # Return the authenticated user
+        # Return the authenticated user, already loaded by the
+        # authentication, without querying the database again
         return self.request.user